@@ -47,6 +47,7 @@
         'security/marketplace_security.xml',
         'security/ir.model.access.csv',
         'data/sequences.xml',
+        'data/cron.xml',
         'data/demo_data.xml',
         'data/category_images.xml',
         'data/recruitment_data.xml',
@@ -68,6 +69,8 @@
         'views/components/featured_section.xml',
         'views/components/footer.xml',
         'views/components/pagination.xml',
+        'views/components/responsive_image.xml',
+        'views/components/robots.xml',
         'views/components/vendor_navbar.xml',
         'views/home_page.xml',
         'views/all_categories_page.xml',
@@ -87,6 +90,7 @@
         'views/vendor_income_page.xml',
         'views/vendor_product_list.xml',
         'views/vendor_add_product.xml',
+        'views/vendor_import_products.xml',
         'views/vendor_edit_product.xml',
         'views/vendor_order_list.xml',
         'views/vendor_order_detail.xml',
@@ -1,58 +1,215 @@
 # -*- coding: utf-8 -*-
-from odoo import http
-from odoo.http import request
+from odoo import http, fields, api
+from odoo.http import request, content_disposition
+from odoo.addons.http_routing.models.ir_http import slug
+from datetime import datetime
+from werkzeug.urls import url_quote_plus
+import functools
+import hashlib
 import math
 import base64
+import json
+
+
+def page_cache(*tags):
+    """Opt-in full-page cache for ``auth='public'`` routes.
+
+    Anonymous visitors without a cart get the stored HTML (with ETag /
+    Last-Modified, answered by a 304 when unchanged). The page is dropped when
+    one of ``tags`` is invalidated (see marketplace.page.cache), 'content'
+    (views, menus) always applies.
+    """
+    tags = ('content',) + tags
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        def wrapper(self, *args, **kwargs):
+            return self._serve_cached_page(tags, lambda: endpoint(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
 
 class MarketplaceController(http.Controller):
-    
+
+    # Numbered page links are an estimate: products are never counted further than this many pages ahead
+    PAGE_LINKS_WINDOW = 5
+
+    # Stands for the visitor's CSRF token in cached pages, it is put back on every response
+    CSRF_PLACEHOLDER = b'__marketplace_csrf_token__'
+
+    def _is_page_cacheable(self):
+        """Only plain GETs of anonymous visitors with no cart share the cached pages"""
+        httprequest = request.httprequest
+        return (
+            httprequest.method in ('GET', 'HEAD')
+            and not httprequest.query_string
+            and not request.session.uid
+            and not request.session.get('sale_order_id')
+            and not request.session.debug
+        )
+
+    def _serve_cached_page(self, tags, render):
+        """Serve ``render()`` through the page cache (see ``page_cache``)"""
+        if not self._is_page_cacheable():
+            return render()
+
+        PageCache = request.env['marketplace.page.cache']
+        # Prices depend on the pricelist, which the website picks per visitor
+        full_key = PageCache._make_key(tags, (
+            request.website.id, request.env.lang, request.website.pricelist_id.id, request.httprequest.path,
+        ))
+        token = request.csrf_token().encode()
+        page = PageCache._get(full_key)
+        if page is None:
+            response = render()
+            if response.status_code != 200 or response.mimetype != 'text/html':
+                return response
+            response.flatten()
+            body = response.get_data().replace(token, self.CSRF_PLACEHOLDER)
+            page = {
+                'body': body,
+                'etag': hashlib.sha1(body).hexdigest(),
+                'last_modified': datetime.utcnow().replace(microsecond=0),
+                'content_type': response.headers['Content-Type'],
+            }
+            PageCache._set(full_key, page)
+
+        response = request.make_response(
+            page['body'].replace(self.CSRF_PLACEHOLDER, token),
+            headers=[('Content-Type', page['content_type']), ('Cache-Control', 'private, no-cache')],
+        )
+        # The page embeds the visitor's token: one ETag per page and session
+        response.set_etag('%s-%s' % (page['etag'], hashlib.sha1(token).hexdigest()[:8]))
+        response.last_modified = page['last_modified']
+        return response.make_conditional(request.httprequest)
+
+    def _get_listing_page(self, domain, sort, page, items_per_page, url, keep_query='', after=None, before=None, search=None):
+        """Fetch one page of a storefront listing and build its pager.
+
+        Prev/Next links carry a keyset cursor (?after= / ?before=), so following
+        them never uses OFFSET nor counts the products. Numbered links are kept as
+        a cheap approximation: they come from a count capped a few pages ahead.
+        The 'relevance' sort (full-text ``search``) only uses numbered pages.
+        Results are cached until the next catalog change (marketplace.listing.cache).
+        """
+        ProductTemplate = request.env['product.template'].sudo()
+        relevance = sort == 'relevance' and bool(search)
+        if sort not in ProductTemplate._LISTING_SORTS:
+            sort = 'default'
+
+        def compute():
+            if (after or before) and not relevance:
+                products, next_cursor, prev_cursor = ProductTemplate._search_listing_page(
+                    domain, sort=sort, limit=items_per_page, after=after, before=before
+                )
+                current_page, total_pages, is_estimate = None, 0, True
+                has_next, has_prev = bool(next_cursor), bool(prev_cursor)
+            else:
+                counted_limit = (page + self.PAGE_LINKS_WINDOW) * items_per_page
+                total_products = ProductTemplate.search_count(domain, limit=counted_limit + 1)
+                is_estimate = total_products > counted_limit
+                total_pages = math.ceil(min(total_products, counted_limit) / items_per_page)
+                current_page = page
+                has_next, has_prev = page < total_pages, page > 1
+
+                offset = (page - 1) * items_per_page
+                if relevance:
+                    # Ranked results have no cursor: Prev/Next use the numbered page URLs
+                    products = ProductTemplate._search_ranked(domain, search, limit=items_per_page, offset=offset)
+                    next_cursor, prev_cursor = False, False
+                else:
+                    products = ProductTemplate.search(
+                        domain, limit=items_per_page, offset=offset, order=ProductTemplate._get_listing_order(sort)
+                    )
+                    next_cursor = products[-1]._encode_listing_cursor(sort) if products and has_next else False
+                    prev_cursor = products[0]._encode_listing_cursor(sort) if products and has_prev else False
+            return {
+                'product_ids': products.ids,
+                'current_page': current_page,
+                'total_pages': total_pages,
+                'is_estimate': is_estimate,
+                'has_next': has_next,
+                'has_prev': has_prev,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor,
+            }
+
+        # Only ids and pager data are cached, the products are browsed again per request
+        Cache = request.env['marketplace.listing.cache']
+        key = Cache._make_key(
+            request.website.id, request.env.lang, domain, sort, search if relevance else None,
+            page, items_per_page, after, before,
+        )
+        result = Cache._get_or_compute('listing', key, compute)
+        products = ProductTemplate.browse(result['product_ids'])
+        next_cursor, prev_cursor = result['next_cursor'], result['prev_cursor']
+        current_page, total_pages = result['current_page'], result['total_pages']
+        is_estimate, has_next, has_prev = result['is_estimate'], result['has_next'], result['has_prev']
+
+        extra_query = '&%s' % keep_query if keep_query else ''
+        pager = {
+            'current_page': current_page,
+            'total_pages': total_pages,
+            'total_is_estimate': is_estimate,
+            'pages': range(1, total_pages + 1),
+            'has_next': has_next,
+            'has_prev': has_prev,
+            'next_num': page + 1,
+            'prev_num': page - 1,
+            'next_url': '%s?after=%s%s' % (url, next_cursor, extra_query) if next_cursor else False,
+            'prev_url': '%s?before=%s%s' % (url, prev_cursor, extra_query) if prev_cursor else False,
+            'keep_query': keep_query,
+        }
+        return products, pager
+
+    def _get_listing_domain(self, category=None, search=None, min_price=None, max_price=None, vendor=None, category_filter=None):
+        """Product domain shared by the category page, /search and the JSON listing API.
+
+        With a ``category`` record (category page) the products of its whole
+        tree are listed and ``search`` filters on the name; without it
+        ``search`` uses the full-text index. ``category_filter`` is the id
+        picked in the /search sidebar.
+        """
+        domain = [('is_published', '=', True)]
+        if category:
+            domain.append(('public_categ_ids', 'child_of', category.id))
+            if search:
+                domain.append(('name', 'ilike', search))
+        elif search:
+            domain.append(('marketplace_text_search', '=', search))
+
+        if min_price:
+            domain.append(('list_price', '>=', float(min_price)))
+        if max_price:
+            domain.append(('list_price', '<=', float(max_price)))
+        if vendor:
+            # Assumes 'vendor' param is the ID
+            domain.append(('vendor_id', '=', int(vendor)))
+        if category_filter:
+            domain.append(('public_categ_ids', 'in', [int(category_filter)]))
+        return domain
+
     # Home Page for guest
     @http.route(['/', '/page/<int:page>'], type='http', auth='public', website=True)
-    def homepage(self, page=1, **kwargs):
+    @page_cache('catalog')
+    def homepage(self, page=1, after=None, before=None, **kwargs):
         # Configuration
         items_per_page = 10
         domain = [('is_published', '=', True)]
         
-        # Calculate Offset (Skip previous pages' items)
-        offset = (page - 1) * items_per_page
-        
-        # Fetch Data
-        ProductTemplate = request.env['product.template'].sudo()
-        
-        # Get total count to calculate total pages
-        total_products = ProductTemplate.search_count(domain)
-        
-        # Get specific slice of products for this page
-        products = ProductTemplate.search(
-            domain, 
-            limit=items_per_page, 
-            offset=offset,
-            order='website_sequence asc, create_date desc'
+        # Fetch the page (offset for numbered pages, keyset cursor for prev/next)
+        products, pager = self._get_listing_page(
+            domain, 'default', page, items_per_page, '/', after=after, before=before
         )
         
         # fetch categories (only featured ones)
         categories = request.env['product.public.category'].sudo().search([('is_featured', '=', True)], limit=6)
 
-        # 4. Pagination Data Calculation
-        total_pages = math.ceil(total_products / items_per_page)
-        
-        # Generate page numbers list (e.g., [1, 2, 3, 4, 5])
-        # Simple logic: show all. For complex logic (1 ... 5 6 7 ... 10), extra python logic is needed.
-        page_range = range(1, total_pages + 1)
-
         return request.render('marketplace_platform.home_page', {
             'categories': categories,
             'products': products,
             # Pagination Data
-            'pager': {
-                'current_page': page,
-                'total_pages': total_pages,
-                'pages': page_range,
-                'has_next': page < total_pages,
-                'has_prev': page > 1,
-                'next_num': page + 1,
-                'prev_num': page - 1,
-            }
+            'pager': pager,
         })
     
     # ALL CATEGORIES PAGE
@@ -74,16 +231,12 @@ class MarketplaceController(http.Controller):
         
         categories = Category.search(domain, limit=items_per_page, offset=offset, order='name asc')
         
-        # Get product count for each category
+        # Product count for each category (stored counter, sub-categories included)
         category_data = []
         for cat in categories:
-            product_count = request.env['product.template'].sudo().search_count([
-                ('is_published', '=', True),
-                ('public_categ_ids', 'child_of', cat.id)
-            ])
             category_data.append({
                 'category': cat,
-                'product_count': product_count
+                'product_count': cat.published_product_count
             })
         
         page_range = range(1, total_pages + 1) if total_pages > 0 else range(1, 2)
@@ -105,64 +258,22 @@ class MarketplaceController(http.Controller):
     # CATEGORY ROUTE
     @http.route(['/category/<model("product.public.category"):category>',
                  '/category/<model("product.public.category"):category>/page/<int:page>'], 
-                type='http', auth="public", website=True)
-    def aura_category_view(self, category, page=1, search=None, min_price=None, max_price=None, vendor=None, sort=None, **kw):
+                type='http', auth="public", website=True, sitemap=False)
+    def aura_category_view(self, category, page=1, search=None, min_price=None, max_price=None, vendor=None, sort=None, after=None, before=None, **kw):
         
         #  Base Configuration
         items_per_page = 10
-        domain = [
-            ('is_published', '=', True),
-            ('public_categ_ids', 'child_of', category.id)
-        ]
-
-        # Apply Search Filter
-        if search:
-            domain.append(('name', 'ilike', search))
 
-        # Apply Filters (if present in URL)
-        if min_price:
-            domain.append(('list_price', '>=', float(min_price)))
-        if max_price:
-            domain.append(('list_price', '<=', float(max_price)))
-        if vendor:
-            # Assumes 'vendor' param is the ID
-            domain.append(('vendor_id', '=', int(vendor)))
-
-        # Determine Sort Order
-        order = 'website_sequence asc, create_date desc'  # Default
-        if sort == 'price_asc':
-            order = 'list_price asc'
-        elif sort == 'price_desc':
-            order = 'list_price desc'
-        elif sort == 'name_asc':
-            order = 'name asc'
-        elif sort == 'newest':
-            order = 'create_date desc'
-        elif sort == 'popular':
-            order = 'website_sequence asc'
-
-        # Calculate Pagination
-        ProductTemplate = request.env['product.template'].sudo()
-        total_products = ProductTemplate.search_count(domain)
-        offset = (page - 1) * items_per_page
-        total_pages = math.ceil(total_products / items_per_page) if total_products > 0 else 1
-        
-        # Fetch Products
-        products = ProductTemplate.search(
-            domain, 
-            limit=items_per_page, 
-            offset=offset, 
-            order=order
+        # Search and filters (if present in URL)
+        domain = self._get_listing_domain(
+            category=category, search=search, min_price=min_price, max_price=max_price, vendor=vendor
         )
 
-        # Fetch Sidebar Data (Vendors available in this category)
-        # We find vendors who actually have products in this category to show in filter
-        all_products_in_cat = ProductTemplate.search([('public_categ_ids', 'child_of', category.id)])
-        available_vendors = all_products_in_cat.mapped('vendor_id')
+        # Fetch Sidebar Data (vendor and price facets with counts)
+        # Counted before the vendor/price filters so every option stays visible
+        facet_domain = self._get_listing_domain(category=category, search=search)
+        facets = request.env['marketplace.listing.facets']._get_facets(facet_domain)
 
-        # Pagination Range
-        page_range = range(1, total_pages + 1) if total_pages > 0 else range(1, 2)
-        
         # Pass current params to keep filters alive during pagination
         filter_params = []
         if search:
@@ -178,20 +289,18 @@ class MarketplaceController(http.Controller):
         
         keep_query = '&'.join(filter_params)
 
+        # Fetch Products (sort keys are defined in product.template._LISTING_SORTS)
+        products, pager = self._get_listing_page(
+            domain, sort or 'default', page, items_per_page, '/category/%s' % slug(category),
+            keep_query=keep_query, after=after, before=before
+        )
+
         return request.render("marketplace_platform.placeholder_category_page", {
             'category': category,
             'products': products,
-            'vendors': available_vendors,
-            'pager': {
-                'current_page': page,
-                'total_pages': total_pages,
-                'pages': page_range,
-                'has_next': page < total_pages,
-                'has_prev': page > 1,
-                'next_num': page + 1,
-                'prev_num': page - 1,
-                'keep_query': keep_query
-            },
+            'vendors': facets['vendors'],
+            'price_facets': facets['prices'],
+            'pager': pager,
             'filters': {
                 'search': search,
                 'min_price': min_price,
@@ -202,16 +311,21 @@ class MarketplaceController(http.Controller):
         })
         
     # PRODUCT ROUTE
-    @http.route('/product/<model("product.template"):product>', type='http', auth="public", website=True)
+    @http.route('/product/<model("product.template"):product>', type='http', auth="public", website=True, sitemap=False)
     def aura_product_view(self, product, **kw):
         # Fetch Related Products
-        # Logic: Same category, excluding current product
-        domain = [
-            ('is_published', '=', True),
-            ('public_categ_ids', 'in', product.public_categ_ids.ids),
-            ('id', '!=', product.id)
-        ]
-        related_products = request.env['product.template'].sudo().search(domain, limit=4)
+        # Logic: precomputed by the 'Compute Related Products' cron (co-purchases + shared categories)
+        related_products = request.env['marketplace.product.related'].sudo()._get_related_products(product, limit=4)
+        if not related_products:
+            # Not computed yet (new product): same category, excluding current product
+            domain = [
+                ('is_published', '=', True),
+                ('public_categ_ids', 'in', product.public_categ_ids.ids),
+                ('id', '!=', product.id)
+            ]
+            related_products = request.env['product.template'].sudo().search(
+                domain, limit=4, order=request.env['product.template']._get_listing_order('default')
+            )
         
         # Fetch Categories (for 'Shop by Vibe' section)
         categories = request.env['product.public.category'].sudo().search([], limit=4)
@@ -231,8 +345,8 @@ class MarketplaceController(http.Controller):
     # VENDOR PROFILE ROUTE
     @http.route(['/vendor/<model("marketplace.vendor"):vendor>',
                  '/vendor/<model("marketplace.vendor"):vendor>/page/<int:page>'], 
-                type='http', auth="public", website=True)
-    def aura_vendor_view(self, vendor, page=1, **kw):
+                type='http', auth="public", website=True, sitemap=False)
+    def aura_vendor_view(self, vendor, page=1, after=None, before=None, **kw):
         
         # Config
         items_per_page = 10
@@ -241,22 +355,10 @@ class MarketplaceController(http.Controller):
             ('vendor_id', '=', vendor.id) # Filter by this vendor
         ]
 
-        # Pagination
-        ProductTemplate = request.env['product.template'].sudo()
-        total_products = ProductTemplate.search_count(domain)
-        offset = (page - 1) * items_per_page
-        total_pages = math.ceil(total_products / items_per_page)
-        
         # Fetch Products
-        products = ProductTemplate.search(
-            domain, 
-            limit=items_per_page, 
-            offset=offset, 
-            order='list_price asc'
+        products, pager = self._get_listing_page(
+            domain, 'price_asc', page, items_per_page, '/vendor/%s' % vendor.id, after=after, before=before
         )
-
-        # Pager Data
-        page_range = range(1, total_pages + 1)
         
         # Get vendor with sudo to bypass access restrictions
         vendor_sudo = vendor.sudo()
@@ -266,62 +368,22 @@ class MarketplaceController(http.Controller):
             'vendor': vendor_sudo,
             'vendor_partner': vendor_partner,
             'products': products,
-            'pager': {
-                'current_page': page,
-                'total_pages': total_pages,
-                'pages': page_range,
-                'has_next': page < total_pages,
-                'has_prev': page > 1,
-                'next_num': page + 1,
-                'prev_num': page - 1,
-            }
+            'pager': pager,
         })
         
     # SEARCH RESULTS ROUTE
     @http.route(['/search', 
                  '/search/page/<int:page>'], 
                 type='http', auth="public", website=True)
-    def aura_search_view(self, page=1, search=None, min_price=None, max_price=None, vendor=None, category=None, sort=None, **kw):
-        
-        # 1. Base Domain (Published products only)
-        domain = [('is_published', '=', True)]
-        
-        # 2. Apply Text Search (Name or Description)
-        if search:
-            domain += ['|', ('name', 'ilike', search), ('description_sale', 'ilike', search)]
-
-        # 3. Apply Filters
-        if min_price:
-            domain.append(('list_price', '>=', float(min_price)))
-        if max_price:
-            domain.append(('list_price', '<=', float(max_price)))
-        if vendor:
-            domain.append(('vendor_id', '=', int(vendor)))
-        if category:
-            domain.append(('public_categ_ids', 'in', [int(category)]))
-
-        # 4. Sort Order
-        order = 'website_sequence asc, create_date desc' # Default
-        if sort == 'price_asc': order = 'list_price asc'
-        elif sort == 'price_desc': order = 'list_price desc'
-        elif sort == 'name_asc': order = 'name asc'
-        elif sort == 'newest': order = 'create_date desc'
-
-        # 5. Pagination
-        items_per_page = 10
-        ProductTemplate = request.env['product.template'].sudo() # SUDO for security
-        total_products = ProductTemplate.search_count(domain)
-        offset = (page - 1) * items_per_page
-        total_pages = math.ceil(total_products / items_per_page)
+    def aura_search_view(self, page=1, search=None, min_price=None, max_price=None, vendor=None, category=None, sort=None, after=None, before=None, **kw):
         
-        products = ProductTemplate.search(domain, limit=items_per_page, offset=offset, order=order)
-
-        # 6. Fetch Filter Data (Categories & Vendors)
-        # We fetch ALL active categories/vendors so the user can filter the search results
-        all_categories = request.env['product.public.category'].sudo().search([])
-        all_vendors = request.env['marketplace.vendor'].sudo().search([('state', '=', 'active')])
+        # 1-3. Published products, text search (full-text index over name, description,
+        #      vendor and categories) and filters
+        domain = self._get_listing_domain(
+            search=search, min_price=min_price, max_price=max_price, vendor=vendor, category_filter=category
+        )
 
-        # 7. URL Query Builder (Keep filters when changing pages)
+        # 4. URL Query Builder (Keep filters when changing pages)
         filter_params = []
         if search: filter_params.append('search=%s' % search)
         if min_price: filter_params.append('min_price=%s' % min_price)
@@ -331,21 +393,26 @@ class MarketplaceController(http.Controller):
         if sort: filter_params.append('sort=%s' % sort)
         keep_query = '&'.join(filter_params)
 
+        # 5. Pagination (sort keys are defined in product.template._LISTING_SORTS)
+        # Without an explicit sort, text searches are ranked by relevance
+        items_per_page = 10
+        products, pager = self._get_listing_page(
+            domain, sort or ('relevance' if search else 'default'), page, items_per_page, '/search',
+            keep_query=keep_query, after=after, before=before, search=search
+        )
+
+        # 6. Fetch Filter Data (category, vendor and price facets with counts)
+        # Counted on the text search only, so picking a filter keeps the other options visible
+        facet_domain = self._get_listing_domain(search=search)
+        facets = request.env['marketplace.listing.facets']._get_facets(facet_domain)
+
         return request.render("marketplace_platform.search_results_page", {
             'search_term': search,
             'products': products,
-            'categories': all_categories,
-            'vendors': all_vendors,
-            'pager': {
-                'current_page': page,
-                'total_pages': total_pages,
-                'pages': range(1, total_pages + 1),
-                'has_next': page < total_pages,
-                'has_prev': page > 1,
-                'next_num': page + 1,
-                'prev_num': page - 1,
-                'keep_query': keep_query
-            },
+            'categories': facets['categories'],
+            'vendors': facets['vendors'],
+            'price_facets': facets['prices'],
+            'pager': pager,
             'filters': {
                 'search': search,
                 'min_price': min_price,
@@ -356,6 +423,58 @@ class MarketplaceController(http.Controller):
             }
         })
 
+    # LISTING API (infinite scroll)
+    @http.route('/listing/products', type='json', auth="public", website=True)
+    def listing_products(self, category_id=None, search=None, min_price=None, max_price=None, vendor=None,
+                         category=None, sort=None, after=None, limit=20, **kw):
+        """Next product cards of a category page (``category_id``) or of /search, as compact dicts.
+
+        Same filters and sorts as the HTML pages; pass the returned ``next_cursor``
+        as ``after`` to load the following cards (False once the listing is over).
+        """
+        ProductTemplate = request.env['product.template'].sudo()
+        limit = max(1, min(int(limit), 60))
+
+        category_record = None
+        if category_id:
+            category_record = request.env['product.public.category'].sudo().browse(int(category_id)).exists()
+            if not category_record:
+                return {'products': [], 'next_cursor': False}
+        domain = self._get_listing_domain(
+            category=category_record, search=search, min_price=min_price, max_price=max_price,
+            vendor=vendor, category_filter=category
+        )
+        if not sort:
+            sort = 'relevance' if search and not category_record else 'default'
+
+        rows, next_cursor = ProductTemplate._search_read_listing_page(
+            domain, ['name', 'list_price', 'vendor_id'], sort=sort, limit=limit, after=after,
+            text=search if not category_record else None,
+        )
+
+        # Image URLs need the checksums of the page (one query), wishlist ids are loaded once
+        products = ProductTemplate.browse([row['id'] for row in rows])
+        wishlist_ids = request.env['product.wishlist'].sudo()._get_wishlist_product_tmpl_ids()
+        cards = []
+        for row, product in zip(rows, products):
+            cards.append({
+                'id': row['id'],
+                'name': row['name'],
+                'price': row['list_price'],
+                'vendor': row['vendor_id'] and row['vendor_id'][1],
+                'url': '/product/%s' % slug((row['id'], row['name'])),
+                'image_url': product._get_marketplace_image_url(512),
+                'in_wishlist': row['id'] in wishlist_ids,
+            })
+        return {'products': cards, 'next_cursor': next_cursor}
+
+    # SEARCH SUGGESTIONS (typeahead)
+    @http.route('/search/suggest', type='json', auth="public", website=True)
+    def search_suggest(self, term='', limit=5, **kw):
+        """Products, vendors and categories matching what has been typed so far"""
+        limit = max(1, min(int(limit), 10))
+        return request.env['marketplace.suggest'].sudo()._suggest(term, limit=limit)
+
     # CUSTOM CART UPDATE (Add to Cart)
     @http.route('/cart/update', type='http', auth="public", methods=['POST'], website=True, csrf=True)
     def cart_update(self, product_id=None, line_id=None, add_qty=None, remove_qty=None, set_qty=None, **kw):
@@ -384,6 +503,7 @@ class MarketplaceController(http.Controller):
                     line.unlink()
                 else:
                     line.sudo().write({'product_uom_qty': new_qty})
+                request.website._update_marketplace_cart_summary(order)
             
             return request.redirect('/cart')
         
@@ -408,6 +528,7 @@ class MarketplaceController(http.Controller):
                 add_qty=qty,
                 set_qty=float(set_qty) if set_qty is not None else 0,
             )
+            request.website._update_marketplace_cart_summary(order)
         
         return request.redirect('/cart')
     
@@ -422,6 +543,9 @@ class MarketplaceController(http.Controller):
             # Create a simplified object to prevent errors in view if order is None
             order = request.env['sale.order']
 
+        # The order is loaded anyway: resync the navbar badge
+        request.website._update_marketplace_cart_summary(order)
+
         return request.render("marketplace_platform.cart_page", {
             'website_sale_order': order,
         })
@@ -429,11 +553,13 @@ class MarketplaceController(http.Controller):
     # ALL CATEGORIES PAGE
     # ABOUT PAGE
     @http.route(['/about'], type='http', auth="public", website=True)
+    @page_cache()
     def about_page(self, **kw):
         return request.render("marketplace_platform.about_page")
     
     # CONTACT PAGE
     @http.route(['/contactus'], type='http', auth="public", website=True)
+    @page_cache()
     def contact_page(self, **kw):
         return request.render("marketplace_platform.contact_page")
     
@@ -609,9 +735,7 @@ class MarketplaceController(http.Controller):
         partner = request.env.user.partner_id
         
         # Check if already a vendor or has pending request
-        existing_vendor = request.env['marketplace.vendor'].sudo().search([
-            ('partner_id', '=', partner.id)
-        ], limit=1)
+        existing_vendor = request.env['marketplace.vendor'].sudo()._get_current_vendor()
         
         if existing_vendor:
             if existing_vendor.state == 'active':
@@ -660,7 +784,7 @@ class MarketplaceController(http.Controller):
     @http.route(['/my/marketplace/products', '/my/marketplace/products/page/<int:page>'], type='http', auth="user", website=True)
     def vendor_products_list(self, page=1, search='', sortby='newest', **kw):
         partner = request.env.user.partner_id
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor:
             return request.redirect('/marketplace/register')
@@ -713,31 +837,17 @@ class MarketplaceController(http.Controller):
         """JSON endpoint to update product quantity"""
         try:
             product = request.env['product.template'].sudo().browse(product_id)
-            current_vendor = request.env['marketplace.vendor'].search([('partner_id', '=', request.env.user.partner_id.id)], limit=1)
+            current_vendor = request.env['marketplace.vendor']._get_current_vendor()
             
-            if not product.exists() or product.vendor_id != current_vendor:
+            if not product.exists() or not current_vendor or product.vendor_id.id != current_vendor.id:
                 return {'success': False, 'error': 'Product not found or access denied'}
             
             # Update quantity
-            warehouse = request.website.warehouse_id
-            if not warehouse:
-                warehouse = request.env['stock.warehouse'].sudo().search([('company_id', '=', request.website.company_id.id)], limit=1)
-            
-            if warehouse and warehouse.lot_stock_id:
-                quant = request.env['stock.quant'].sudo().search([
-                    ('product_id', '=', product.product_variant_id.id),
-                    ('location_id', '=', warehouse.lot_stock_id.id)
-                ], limit=1)
-                
-                if quant:
-                    quant.sudo().write({'quantity': float(quantity)})
-                else:
-                    request.env['stock.quant'].sudo().create({
-                        'product_id': product.product_variant_id.id,
-                        'location_id': warehouse.lot_stock_id.id,
-                        'quantity': float(quantity),
-                    })
-                
+            location_id = request.website._get_marketplace_stock_location_id()
+            if location_id:
+                request.env['stock.quant']._marketplace_set_quantities(location_id, {
+                    product.product_variant_id.id: float(quantity),
+                })
                 return {'success': True, 'new_quantity': float(quantity)}
             
             return {'success': False, 'error': 'Warehouse not found'}
@@ -745,14 +855,41 @@ class MarketplaceController(http.Controller):
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    # BULK STOCK SYNC (vendor inventory systems)
+    @http.route('/my/marketplace/stock/sync', type='json', auth="user", website=True)
+    def vendor_stock_sync(self, items=None, **kw):
+        """JSON endpoint setting the quantity of many products at once.
+
+        ``items``: ``[{"sku": "A-1", "quantity": 4}, {"product_id": 12, "quantity": 0}, ...]``.
+        Quantities are absolute, so a retried call is safe.
+        """
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
+        if not vendor or vendor.state != 'active':
+            return {'success': False, 'error': 'Vendor not found'}
+
+        if not isinstance(items, list) or not items:
+            return {'success': False, 'error': 'items must be a non-empty list'}
+        if len(items) > 10000:
+            return {'success': False, 'error': 'At most 10000 items per call'}
+
+        # One (cached) stock location for the whole call
+        location_id = request.website._get_marketplace_stock_location_id()
+        if not location_id:
+            return {'success': False, 'error': 'Warehouse not found'}
+
+        result = request.env['stock.quant']._marketplace_sync_vendor_stock(
+            vendor, [item if isinstance(item, dict) else {} for item in items], location_id
+        )
+        return dict(result, success=True)
+    
     # DELETE PRODUCT ACTION
     @http.route('/my/marketplace/product/delete/<int:product_id>', type='http', auth="user", website=True)
     def vendor_product_delete(self, product_id, **kw):
         # Security Check: Ensure product belongs to current vendor
         product = request.env['product.template'].sudo().browse(product_id)
-        current_vendor = request.env['marketplace.vendor'].search([('partner_id', '=', request.env.user.partner_id.id)], limit=1)
+        current_vendor = request.env['marketplace.vendor']._get_current_vendor()
         
-        if product.exists() and product.vendor_id == current_vendor:
+        if product.exists() and current_vendor and product.vendor_id.id == current_vendor.id:
             product.unlink() # Or set to archived: product.active = False
         
         return request.redirect('/my/marketplace/products')
@@ -761,9 +898,9 @@ class MarketplaceController(http.Controller):
     @http.route('/my/marketplace/product/duplicate/<int:product_id>', type='http', auth="user", website=True)
     def vendor_product_duplicate(self, product_id, **kw):
         product = request.env['product.template'].sudo().browse(product_id)
-        current_vendor = request.env['marketplace.vendor'].search([('partner_id', '=', request.env.user.partner_id.id)], limit=1)
+        current_vendor = request.env['marketplace.vendor']._get_current_vendor()
         
-        if product.exists() and product.vendor_id == current_vendor:
+        if product.exists() and current_vendor and product.vendor_id.id == current_vendor.id:
             new_product = product.copy({
                 'name': product.name + ' (Copy)',
                 'is_published': False, # Start as draft
@@ -776,7 +913,7 @@ class MarketplaceController(http.Controller):
     @http.route('/my/marketplace/products/add', type='http', auth="user", website=True)
     def vendor_product_add(self, **kw):
         partner = request.env.user.partner_id
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor or vendor.state != 'active':
             return request.redirect('/marketplace/register')
@@ -795,7 +932,7 @@ class MarketplaceController(http.Controller):
     @http.route('/my/marketplace/products/submit', type='http', auth="user", methods=['POST'], website=True, csrf=True)
     def vendor_product_submit(self, **post):
         partner = request.env.user.partner_id
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor:
             return request.redirect('/marketplace/register')
@@ -837,41 +974,74 @@ class MarketplaceController(http.Controller):
 
             # 4. Handle Stock - Direct quantity update without inventory adjustment validation
             qty = float(post.get('quantity') or 0.0)
-            if qty > 0:
-                warehouse = request.website.warehouse_id
-                if not warehouse:
-                    warehouse = request.env['stock.warehouse'].sudo().search([('company_id', '=', request.website.company_id.id)], limit=1)
-                
-                if warehouse and warehouse.lot_stock_id:
-                    # Check if quant already exists
-                    quant = request.env['stock.quant'].sudo().search([
-                        ('product_id', '=', product_tmpl.product_variant_id.id),
-                        ('location_id', '=', warehouse.lot_stock_id.id)
-                    ], limit=1)
-                    
-                    if quant:
-                        # Update existing quant directly
-                        quant.sudo().write({'quantity': qty})
-                    else:
-                        # Create new quant with direct quantity (bypasses inventory adjustment)
-                        request.env['stock.quant'].sudo().create({
-                            'product_id': product_tmpl.product_variant_id.id,
-                            'location_id': warehouse.lot_stock_id.id,
-                            'quantity': qty,  # Use 'quantity' not 'inventory_quantity'
-                        })
+            location_id = request.website._get_marketplace_stock_location_id()
+            if qty > 0 and location_id:
+                request.env['stock.quant']._marketplace_set_quantities(location_id, {
+                    product_tmpl.product_variant_id.id: qty,
+                })
 
             return request.redirect('/my/marketplace/products?success=pending')
 
         except Exception as e:
             return request.redirect('/my/marketplace/products/add?error=' + str(e))
                 
+    # BULK PRODUCT IMPORT (CSV / XLSX)
+    @http.route('/my/marketplace/products/import', type='http', auth="user", website=True)
+    def vendor_product_import(self, **kw):
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
+        
+        if not vendor or vendor.state != 'active':
+            return request.redirect('/marketplace/register')
+
+        return request.render("marketplace_platform.vendor_import_products_page", {
+            'page_name': 'products',
+            'vendor': vendor,
+            'columns': request.env['marketplace.product.import']._COLUMNS,
+            'report': None,
+            'error': kw.get('error'),
+            'user_id': request.env.user,
+        })
+
+    @http.route('/my/marketplace/products/import/submit', type='http', auth="user", methods=['POST'], website=True, csrf=True)
+    def vendor_product_import_submit(self, **post):
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
+        
+        if not vendor or vendor.state != 'active':
+            return request.redirect('/marketplace/register')
+
+        file = request.params.get('file')
+        if not (hasattr(file, 'stream') and file.filename):
+            return request.redirect('/my/marketplace/products/import?error=' + url_quote_plus('Please choose a CSV or XLSX file'))
+
+        # Stock location, resolved once for the whole file
+        location_id = request.website._get_marketplace_stock_location_id()
+
+        try:
+            # The upload is read from its (disk-spooled) stream, row by row
+            report = request.env['marketplace.product.import']._import_products(
+                vendor, file.filename, file.stream,
+                website=request.website, location_id=location_id,
+            )
+        except Exception as e:
+            # Unreadable file (wrong format or encoding)
+            return request.redirect('/my/marketplace/products/import?error=' + url_quote_plus(str(e)))
+
+        return request.render("marketplace_platform.vendor_import_products_page", {
+            'page_name': 'products',
+            'vendor': vendor,
+            'columns': request.env['marketplace.product.import']._COLUMNS,
+            'report': report,
+            'error': None,
+            'user_id': request.env.user,
+        })
+                
     # RENDER EDIT PRODUCT PAGE
     @http.route('/my/marketplace/product/edit/<int:product_id>', type='http', auth="user", website=True)
     def vendor_product_edit(self, product_id, **kw):
         partner = request.env.user.partner_id
         
         # Security: Check if vendor exists
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         if not vendor:
             return request.redirect('/marketplace/register')
             
@@ -895,10 +1065,10 @@ class MarketplaceController(http.Controller):
     @http.route('/my/marketplace/product/edit/submit/<int:product_id>', type='http', auth="user", methods=['POST'], website=True, csrf=True)
     def vendor_product_edit_submit(self, product_id, **post):
         partner = request.env.user.partner_id
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         product = request.env['product.template'].sudo().browse(product_id)
-        if not product.exists() or product.vendor_id.id != vendor.id:
+        if not vendor or not product.exists() or product.vendor_id != vendor:
             return request.redirect('/my/marketplace/products')
 
         try:
@@ -928,27 +1098,11 @@ class MarketplaceController(http.Controller):
             if 'quantity' in post:
                 new_qty = float(post.get('quantity') or 0.0)
                 
-                warehouse = request.website.warehouse_id
-                if not warehouse:
-                    warehouse = request.env['stock.warehouse'].sudo().search([('company_id', '=', request.website.company_id.id)], limit=1)
-                
-                if warehouse and warehouse.lot_stock_id:
-                    # Find existing quant for this product
-                    quant = request.env['stock.quant'].sudo().search([
-                        ('product_id', '=', product.product_variant_id.id),
-                        ('location_id', '=', warehouse.lot_stock_id.id)
-                    ], limit=1)
-                    
-                    if quant:
-                        # Update existing quant directly
-                        quant.sudo().write({'quantity': new_qty})
-                    else:
-                        # Create new quant with direct quantity
-                        request.env['stock.quant'].sudo().create({
-                            'product_id': product.product_variant_id.id,
-                            'location_id': warehouse.lot_stock_id.id,
-                            'quantity': new_qty,
-                        })
+                location_id = request.website._get_marketplace_stock_location_id()
+                if location_id:
+                    request.env['stock.quant']._marketplace_set_quantities(location_id, {
+                        product.product_variant_id.id: new_qty,
+                    })
 
             return request.redirect('/my/marketplace/products')
 
@@ -963,39 +1117,29 @@ class MarketplaceController(http.Controller):
     def vendor_orders_list(self, page=1, search='', status='all', **kw):
         # 1. Get Vendor
         partner = request.env.user.partner_id
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor:
             return request.redirect('/marketplace/register')
 
-        # 2. Search for Order Lines (Sudo to see all lines)
-        SaleLine = request.env['sale.order.line'].sudo()
+        # 2. Search the vendor's share of each order (Sudo to see all lines)
+        # marketplace.vendor.order groups the lines per (order, vendor) in SQL
+        VendorOrder = request.env['marketplace.vendor.order'].sudo()
         
-        # Base domain: Lines containing this vendor's products
-        line_domain = [('product_id.product_tmpl_id.vendor_id', '=', vendor.id)]
+        # Base domain: Orders containing this vendor's products
+        domain = [('vendor_id', '=', vendor.id)]
         
         # Search Filter
         if search:
-            line_domain += ['|', ('order_id.name', 'ilike', search), ('order_id.partner_id.name', 'ilike', search)]
+            domain += ['|', ('name', 'ilike', search), ('partner_id.name', 'ilike', search)]
             
         # Status Filter
         if status != 'all':
-            line_domain += [('order_id.state', '=', status)]
-
-        # Fetch lines
-        vendor_lines = SaleLine.search(line_domain)
-        
-        # 3. Group by Order
-        # We use mapped to get unique orders, then sort by date (newest first)
-        order_ids = vendor_lines.mapped('order_id')
-        
-        # Manual sorting because mapped() returns unsorted recordset
-        # We handle the case where date_order might be missing (rare but safer)
-        order_ids = order_ids.sorted(key=lambda r: r.date_order or r.create_date, reverse=True)
+            domain += [('state', '=', status)]
 
-        # 4. Pagination (Python Slicing)
+        # 3. Pagination (ORDER BY / LIMIT in the database, newest first)
         items_per_page = 15
-        total_orders = len(order_ids)
+        total_orders = VendorOrder.search_count(domain)
         
         pager = request.website.pager(
             url='/my/marketplace/orders',
@@ -1005,27 +1149,17 @@ class MarketplaceController(http.Controller):
             url_args={'search': search, 'status': status}
         )
         
-        # Slice the recordset for the current page
-        start = (page - 1) * items_per_page
-        end = start + items_per_page
-        orders_page = order_ids[start:end]
+        summaries = VendorOrder.search(domain, limit=items_per_page, offset=(page - 1) * items_per_page)
 
-        # 5. Calculate Vendor-Specific Totals
+        # 4. Vendor-Specific Totals, already computed per order
+        # (An order might have $100 total, but only $20 is for this vendor)
         orders_data = []
-        for order in orders_page:
-            # Filter lines AGAIN to calculate only THIS vendor's share
-            # (An order might have $100 total, but only $20 is for this vendor)
-            my_lines = order.order_line.filtered(lambda l: l.product_id.product_tmpl_id.vendor_id.id == vendor.id)
-            
-            vendor_total = sum(my_lines.mapped('price_subtotal'))
-            product_names = ", ".join(my_lines.mapped('product_id.name'))
-            total_qty = sum(my_lines.mapped('product_uom_qty'))
-            
+        for summary in summaries:
             orders_data.append({
-                'order': order,
-                'vendor_total': vendor_total,
-                'products_display': product_names,
-                'item_count': int(total_qty)
+                'order': summary.order_id,
+                'vendor_total': summary.vendor_total,
+                'products_display': summary.product_names,
+                'item_count': int(summary.item_count)
             })
 
         values = {
@@ -1043,7 +1177,7 @@ class MarketplaceController(http.Controller):
     @http.route('/my/marketplace/order/<int:order_id>', type='http', auth="user", website=True)
     def vendor_order_detail(self, order_id, **kw):
         partner = request.env.user.partner_id
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor:
             return request.redirect('/marketplace/register')
@@ -1098,7 +1232,7 @@ class MarketplaceController(http.Controller):
     @http.route('/my/marketplace/settings', type='http', auth="user", website=True)
     def vendor_settings(self, **kw):
         partner = request.env.user.partner_id
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor:
             return request.redirect('/marketplace/register')
@@ -1116,7 +1250,7 @@ class MarketplaceController(http.Controller):
     @http.route('/my/marketplace/settings/submit', type='http', auth="user", methods=['POST'], website=True, csrf=True)
     def vendor_settings_submit(self, **post):
         partner = request.env.user.partner_id
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor:
             return request.redirect('/marketplace/register')
@@ -1242,6 +1376,34 @@ class MarketplaceController(http.Controller):
         
         return request.redirect(request.httprequest.referrer or '/')
     
+    # TOGGLE WISHLIST (AJAX, used by wishlist_ajax.js)
+    @http.route('/wishlist/toggle', type='json', auth="user", website=True)
+    def aura_wishlist_toggle(self, product_tmpl_id, **kw):
+        """Add or remove a product template, returns the new state and the wishlist count"""
+        partner = request.env.user.partner_id
+        product_tmpl = request.env['product.template'].browse(int(product_tmpl_id)).exists()
+        if not product_tmpl or not product_tmpl.product_variant_ids:
+            return {'error': 'product_not_found'}
+
+        Wishlist = request.env['product.wishlist']
+        existing = Wishlist.search([
+            ('partner_id', '=', partner.id),
+            ('product_id', 'in', product_tmpl.product_variant_ids.ids)
+        ])
+        if existing:
+            existing.unlink()
+        else:
+            Wishlist._add_to_wishlist(
+                partner_id=partner.id,
+                product_id=product_tmpl.product_variant_ids[0].id,
+                website_id=request.website.id
+            )
+
+        return {
+            'in_wishlist': not existing,
+            'wishlist_count': Wishlist.search_count([('partner_id', '=', partner.id)]),
+        }
+
     # 3. ACTION: REMOVE SINGLE ITEM
     @http.route(['/wishlist/remove/<int:wishlist_id>'], type='http', auth="user", website=True)
     def wishlist_remove(self, wishlist_id, **kw):
@@ -1263,6 +1425,7 @@ class MarketplaceController(http.Controller):
                 order._cart_update(product_id=item.product_id.id, add_qty=1)
                 # Delete from wishlist
                 item.unlink()
+            request.website._update_marketplace_cart_summary(order)
                 
         return request.redirect('/cart')
 
@@ -1281,62 +1444,28 @@ class MarketplaceController(http.Controller):
         
         # 1. Get Vendor Profile
         # Assuming you linked partner -> vendor in previous steps
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor or vendor.state != 'active':
             return request.redirect('/marketplace/register')
 
-        # 2. Calculate Metrics
-        
-        # Products
-        active_products_count = request.env['product.template'].search_count([
-            ('vendor_id', '=', vendor.id),
-            ('is_published', '=', True)
-        ])
-        
-        # Sales (Lines belonging to this vendor)
-        # We search Order Lines where the product belongs to the vendor
-        vendor_lines = request.env['sale.order.line'].sudo().search([
-            ('order_id.state', 'in', ['sale', 'done']),
-            ('product_id.product_tmpl_id.vendor_id', '=', vendor.id)
-        ])
-        
-        total_sales_amount = sum(vendor_lines.mapped('price_subtotal'))
-        total_orders_count = len(set(vendor_lines.mapped('order_id.id')))
-        
-        # Recent Orders (Get the last 5 distinct orders)
-        recent_orders = vendor_lines.mapped('order_id').sorted(key=lambda r: r.date_order, reverse=True)[:5]
+        # 2. Calculate Metrics (grouped in SQL, see marketplace.vendor._get_dashboard_metrics)
+        metrics = vendor.sudo()._get_dashboard_metrics(days=7)
 
-        # Get sales data for the last 7 days for charts
-        from datetime import datetime, timedelta
-        import json
-        today = datetime.now().date()
-        chart_data = []
-        chart_labels = []
-        
-        for i in range(6, -1, -1):  # Last 7 days (6 days ago to today)
-            target_date = today - timedelta(days=i)
-            day_name = target_date.strftime('%a')  # Mon, Tue, Wed...
-            
-            # Get sales for this specific day
-            day_lines = vendor_lines.filtered(
-                lambda l: l.order_id.date_order.date() == target_date
-            )
-            day_total = sum(day_lines.mapped('price_subtotal'))
-            
-            chart_labels.append(day_name)
-            chart_data.append(round(day_total, 2))
+        # Sales of the last 7 days for the chart (6 days ago to today)
+        chart_labels = [day.strftime('%a') for day, _total in metrics['chart']]  # Mon, Tue, Wed...
+        chart_data = [round(total, 2) for _day, total in metrics['chart']]
 
         values = {
             'page_name': 'dashboard', # For navbar active state
             'vendor': vendor,
             'metrics': {
-                'sales': total_sales_amount,
-                'orders': total_orders_count,
-                'products': active_products_count,
+                'sales': metrics['sales'],
+                'orders': metrics['orders'],
+                'products': metrics['products'],
                 'balance': vendor.balance, # From your model
             },
-            'recent_orders': recent_orders,
+            'recent_orders': metrics['recent_orders'],
             'user_id': request.env.user,
             'chart_labels': json.dumps(chart_labels),
             'chart_data': json.dumps(chart_data),
@@ -1344,45 +1473,142 @@ class MarketplaceController(http.Controller):
         
         return request.render("marketplace_platform.portal_vendor_dashboard", values)
     
+    # VENDOR SALES ANALYTICS (daily rollup)
+    @http.route('/my/marketplace/analytics', type='json', auth="user", website=True)
+    def vendor_sales_analytics(self, date_from=None, date_to=None, granularity='day', **kw):
+        """JSON sales series of the current vendor, read from marketplace.vendor.sales.daily only"""
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
+        if not vendor or vendor.state != 'active':
+            return {'success': False, 'error': 'Vendor not found'}
+
+        Daily = request.env['marketplace.vendor.sales.daily'].sudo()
+        if granularity not in Daily._GRANULARITIES:
+            return {'success': False, 'error': 'Invalid granularity'}
+        try:
+            date_to = fields.Date.to_date(date_to) or fields.Date.today()
+            date_from = fields.Date.to_date(date_from) or fields.Date.subtract(date_to, days=29)
+        except ValueError:
+            return {'success': False, 'error': 'Invalid date'}
+        if date_from > date_to:
+            return {'success': False, 'error': 'Invalid date range'}
+
+        result = Daily._get_series(vendor, date_from, date_to, granularity)
+        return dict(result,
+                    success=True,
+                    date_from=fields.Date.to_string(date_from),
+                    date_to=fields.Date.to_string(date_to),
+                    granularity=granularity)
+
     # VENDOR INCOME & COMMISSION PAGE
-    @http.route(['/my/marketplace/income'], type='http', auth="user", website=True)
-    def vendor_income(self, **kw):
+    @http.route(['/my/marketplace/income', '/my/marketplace/income/page/<int:page>'], type='http', auth="user", website=True)
+    def vendor_income(self, page=1, state='all', date_from=None, date_to=None, **kw):
         user = request.env.user
         partner = user.partner_id
         
         # Get Vendor Profile
-        vendor = request.env['marketplace.vendor'].search([('partner_id', '=', partner.id)], limit=1)
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
         
         if not vendor or vendor.state != 'active':
             return request.redirect('/marketplace/register')
 
-        # Get all commissions for this vendor
-        commissions = request.env['marketplace.commission'].sudo().search([
-            ('vendor_id', '=', vendor.id)
-        ], order='create_date desc')
-        
-        # Calculate totals
-        confirmed_commissions = commissions.filtered(lambda c: c.state in ['confirmed', 'paid'])
-        paid_commissions = commissions.filtered(lambda c: c.state == 'paid')
-        
-        total_earnings = sum(confirmed_commissions.mapped('sale_amount')) if confirmed_commissions else 0.0
-        total_commission = sum(confirmed_commissions.mapped('amount_commission')) if confirmed_commissions else 0.0
-        net_income = total_earnings - total_commission
-        available_balance = sum(confirmed_commissions.mapped('vendor_amount')) - sum(paid_commissions.mapped('vendor_amount')) if confirmed_commissions else 0.0
+        Commission = request.env['marketplace.commission'].sudo()
 
-        values = {
+        # Totals over the whole history, from one grouped query
+        totals = Commission._get_vendor_totals(vendor)
+
+        # Commission ledger: filters (state, date range) and pagination in the database
+        domain = [('vendor_id', '=', vendor.id)]
+        if state in ('confirmed', 'paid'):
+            domain += [('state', '=', state)]
+        else:
+            state = 'all'
+        try:
+            date_from = fields.Date.to_date(date_from)
+        except ValueError:
+            date_from = None
+        try:
+            date_to = fields.Date.to_date(date_to)
+        except ValueError:
+            date_to = None
+        if date_from:
+            domain += [('create_date', '>=', date_from)]
+        if date_to:
+            domain += [('create_date', '<', fields.Date.add(date_to, days=1))]
+
+        items_per_page = 20
+        url_args = {'state': state}
+        if date_from:
+            url_args['date_from'] = fields.Date.to_string(date_from)
+        if date_to:
+            url_args['date_to'] = fields.Date.to_string(date_to)
+        pager = request.website.pager(
+            url='/my/marketplace/income',
+            total=Commission.search_count(domain),
+            page=page,
+            step=items_per_page,
+            url_args=url_args,
+        )
+        commissions = Commission.search(domain, order='create_date desc, id desc',
+                                        limit=items_per_page, offset=pager['offset'])
+
+        values = dict(totals, **{
             'page_name': 'income',
             'vendor': vendor,
             'commissions': commissions,
-            'total_earnings': total_earnings,
-            'total_commission': total_commission,
-            'net_income': net_income,
-            'available_balance': available_balance,
+            'pager': pager,
+            'state': state,
+            'date_from': url_args.get('date_from', ''),
+            'date_to': url_args.get('date_to', ''),
             'user_id': request.env.user,
-        }
+        })
         
         return request.render("marketplace_platform.vendor_income_page", values)
     
+    # VENDOR EXPORTS (orders, commissions) - streamed CSV / XLSX
+    @http.route('/my/marketplace/export/<string:kind>', type='http', auth="user", website=True)
+    def vendor_export(self, kind, fmt='csv', date_from=None, date_to=None, state=None, **kw):
+        vendor = request.env['marketplace.vendor']._get_current_vendor()
+        
+        if not vendor or vendor.state != 'active':
+            return request.redirect('/marketplace/register')
+
+        Export = request.env['marketplace.vendor.export']
+        if kind not in Export._HEADERS or fmt not in ('csv', 'xlsx'):
+            return request.not_found()
+        if fmt not in Export._get_formats():
+            fmt = 'csv'
+
+        filters = {'state': state if state in Export._STATES[kind] else None}
+        for key, value in (('date_from', date_from), ('date_to', date_to)):
+            try:
+                filters[key] = fields.Date.to_date(value)
+            except ValueError:
+                filters[key] = None
+
+        # The rows are read while the response is being sent, after this
+        # request's cursor is closed: the generator opens its own cursor.
+        # CSV starts at once, XLSX only once the workbook is complete.
+        registry, uid, context = request.env.registry, request.env.uid, dict(request.env.context)
+        vendor_id = vendor.id
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                exporter = env['marketplace.vendor.export'].sudo()
+                stream = exporter._stream_xlsx if fmt == 'xlsx' else exporter._stream_csv
+                yield from stream(kind, vendor_id, **filters)
+
+        filename = '%s-%s-%s.%s' % (vendor.shop_url or vendor.id, kind, fields.Date.to_string(fields.Date.today()), fmt)
+        content_type = (
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' if fmt == 'xlsx'
+            else 'text/csv; charset=utf-8'
+        )
+        return request.make_response(generate(), headers=[
+            ('Content-Type', content_type),
+            ('Content-Disposition', content_disposition(filename)),
+            ('Cache-Control', 'no-store'),
+        ])
+    
     # CUSTOM CHECKOUT ROUTES
     @http.route(['/shop/checkout/address'], type='http', auth="public", website=True)
     def custom_checkout_address(self, **kw):
@@ -1448,6 +1674,7 @@ class MarketplaceController(http.Controller):
             
             # Clear the cart session
             request.website.sale_reset()
+            request.website._update_marketplace_cart_summary(request.env['sale.order'])
             
             # Show success page
             return request.render("marketplace_platform.order_confirmation_page", {
@@ -1466,6 +1693,7 @@ class MarketplaceController(http.Controller):
         
     # OUR STORY (About Us)
     @http.route('/about-us', type='http', auth="public", website=True)
+    @page_cache()
     def about_us_page(self, **kw):
         return request.render("marketplace_platform.about_us_page")
 
@@ -1552,6 +1780,7 @@ class MarketplaceController(http.Controller):
 
     # BLOG (Custom Page)
     @http.route('/blog', type='http', auth="public", website=True)
+    @page_cache('blog')
     def blog(self, **kw):
         # Récupération des articles publiés via l'ORM Odoo
         BlogPost = request.env['blog.post'].sudo()
@@ -1570,8 +1799,34 @@ class MarketplaceController(http.Controller):
             'posts': other_posts
         })
 
+    # SITEMAPS (products, vendors, categories, blog posts)
+    # The record routes are listed here (sitemap=False on them), so website's
+    # /sitemap.xml does not enumerate every record through the URL converters
+    @http.route('/marketplace/sitemap.xml', type='http', auth="public", website=True, sitemap=False)
+    def marketplace_sitemap_index(self, **kw):
+        document = request.env['marketplace.sitemap'].sudo()._get_document(request.website.get_base_url())
+        return self._sitemap_response(document)
+
+    @http.route('/marketplace/sitemap/<string:kind>/<int:number>.xml', type='http', auth="public", website=True, sitemap=False)
+    def marketplace_sitemap_file(self, kind, number, **kw):
+        Sitemap = request.env['marketplace.sitemap'].sudo()
+        if kind not in Sitemap._KINDS:
+            return request.not_found()
+        document = Sitemap._get_document(request.website.get_base_url(), kind, number)
+        if document is None:
+            return request.not_found()
+        return self._sitemap_response(document)
+
+    def _sitemap_response(self, document):
+        response = request.make_response(document, headers=[
+            ('Content-Type', 'application/xml;charset=utf-8'),
+            ('Cache-Control', 'public, max-age=3600'),
+        ])
+        response.set_etag(hashlib.sha1(document).hexdigest())
+        return response.make_conditional(request.httprequest)
+
     # ROUTE POUR LIRE UN ARTICLE
-    @http.route('/blog/post/<int:post_id>', type='http', auth="public", website=True)
+    @http.route('/blog/post/<int:post_id>', type='http', auth="public", website=True, sitemap=False)
     def blog_post_detail(self, post_id, **kw):
         # Récupération de l'article spécifique
         post = request.env['blog.post'].sudo().browse(post_id)
@@ -1582,15 +1837,19 @@ class MarketplaceController(http.Controller):
         return request.render("marketplace_platform.blog_post_detail_page", {'post': post})
         
     @http.route('/faq', type='http', auth="public", website=True)
+    @page_cache()
     def faq(self, **kw): return request.render("marketplace_platform.faq_page")
 
     @http.route('/shipping', type='http', auth="public", website=True)
+    @page_cache()
     def shipping(self, **kw): return request.render("marketplace_platform.shipping_page")
 
     @http.route('/e-terms', type='http', auth="public", website=True)
+    @page_cache()
     def terms(self, **kw): return request.render("marketplace_platform.terms_page")
 
     @http.route(['/privacy', '/page/website.privacy'], type='http', auth="public", website=True)
+    @page_cache()
     def privacy(self, **kw): return request.render("marketplace_platform.privacy_page")
     
 
@@ -1616,43 +1875,27 @@ class MarketplaceController(http.Controller):
         return request.render("marketplace_platform.chem_your_page", {'products': featured})
 
     @http.route('/makers', type='http', auth="public", website=True)
-    def makers_page(self, page=1, search=None, **kw):
+    def makers_page(self, search=None, after=None, before=None, **kw):
         items_per_page = 12
         Vendor = request.env['marketplace.vendor'].sudo()
         
-        # 1. Domaine de base : Vendeurs actifs uniquement
-        # ATTENTION : Vérifiez dans votre DB que vos vendeurs sont bien 'active'
-        # Si vous testez avec des vendeurs 'new', changez temporairement en :
-        # domain = [('state', 'in', ['new', 'active'])]
-        domain = [('state', '=', 'active')]
-        
-        # 2. Logique de Recherche Avancée
-        if search:
-            # Recherche insensible à la casse sur le Nom OU la Description
-            for srch in search.split(" "):
-                domain += [
-                    '|', 
-                    ('shop_name', 'ilike', srch),
-                    ('description', 'ilike', srch)
-                ]
-        
-        total_vendors = Vendor.search_count(domain)
-        
-        # Pagination
-        pager = request.website.pager(
-            url='/makers',
-            total=total_vendors,
-            page=page,
-            step=items_per_page,
-            url_args={'search': search} if search else {}
+        # 1. Vendeurs actifs uniquement, classés par pertinence (texte + ventes) si recherche,
+        #    sinon par ventes. Pagination par curseur (?after= / ?before=), sans OFFSET ni COUNT
+        vendors, next_cursor, prev_cursor = Vendor._search_makers_page(
+            search=search, limit=items_per_page, after=after, before=before
         )
         
-        offset = (page - 1) * items_per_page
-        
-        # Tri par pertinence (si recherche) ou par ventes (si pas de recherche)
-        order = 'sale_count desc'
-        
-        vendors = Vendor.search(domain, limit=items_per_page, offset=offset, order=order)
+        # 2. Pagination (Prev / Next only: the directory is never counted)
+        keep_query = 'search=%s' % url_quote_plus(search) if search else ''
+        extra_query = '&%s' % keep_query if keep_query else ''
+        pager = {
+            'pages': [],
+            'total_pages': 0,
+            'has_next': bool(next_cursor),
+            'has_prev': bool(prev_cursor),
+            'next_url': '/makers?after=%s%s' % (next_cursor, extra_query) if next_cursor else False,
+            'prev_url': '/makers?before=%s%s' % (prev_cursor, extra_query) if prev_cursor else False,
+        }
         
         return request.render("marketplace_platform.makers_page", {
             'vendors': vendors,
@@ -9,3 +9,16 @@ from . import payout
 from . import stock_picking
 from . import wishlist
 from . import blog_extension
+from . import listing_facets
+from . import listing_cache
+from . import page_cache
+from . import website
+from . import ir_qweb
+from . import product_related
+from . import suggest_index
+from . import sitemap
+from . import vendor_sales_daily
+from . import vendor_order
+from . import stock_quant
+from . import product_import
+from . import vendor_export
@@ -1,7 +1,21 @@
-from odoo import models, fields
+from odoo import models, fields, api
 
 class BlogPost(models.Model):
     _inherit = 'blog.post'
 
     # Ajout d'un champ image simple pour faciliter l'affichage dans votre design custom
-    image_preview = fields.Image("Image Aperçu", max_width=1024, max_height=1024, help="Image utilisée sur la page d'accueil du blog marketplace")
\ No newline at end of file
+    image_preview = fields.Image("Image Aperçu", max_width=1024, max_height=1024, help="Image utilisée sur la page d'accueil du blog marketplace")
+
+    # Les pages /blog en cache sont invalidées à chaque modification d'article
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env['marketplace.page.cache']._invalidate('blog')
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env['marketplace.page.cache']._invalidate('blog')
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['marketplace.page.cache']._invalidate('blog')
+        return super().unlink()
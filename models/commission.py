@@ -8,7 +8,7 @@ class MarketplaceCommission(models.Model):
 
     name = fields.Char(string="Référence", default="New", readonly=True)
     
-    vendor_id = fields.Many2one('marketplace.vendor', string="Vendeur", required=True)
+    vendor_id = fields.Many2one('marketplace.vendor', string="Vendeur", required=True, index=True)
     order_line_id = fields.Many2one('sale.order.line', string="Ligne de commande", required=True)
     
     currency_id = fields.Many2one('res.currency', related='order_line_id.currency_id')
@@ -32,6 +32,9 @@ class MarketplaceCommission(models.Model):
         ('cancel', 'Annulé')
     ], default='draft', string="Statut")
 
+    # Fields changing what a commission adds to marketplace.vendor.sales.daily
+    _SALES_DAILY_FIELDS = {'state', 'order_line_id', 'vendor_id', 'commission_rate'}
+
     @api.depends('order_line_id.price_subtotal', 'commission_rate')
     def _compute_amounts(self):
         for record in self:
@@ -50,4 +53,50 @@ class MarketplaceCommission(models.Model):
     def create(self, vals):
         if vals.get('name', 'New') == 'New':
             vals['name'] = self.env['ir.sequence'].next_by_code('marketplace.commission') or 'New'
-        return super(MarketplaceCommission, self).create(vals)
\ No newline at end of file
+        commission = super(MarketplaceCommission, self).create(vals)
+        # Confirming an order creates its commissions: they enter the daily sales rollup
+        self.env['marketplace.vendor.sales.daily']._schedule_refresh(commission._get_sales_daily_keys())
+        return commission
+
+    def write(self, vals):
+        touched = self._SALES_DAILY_FIELDS.intersection(vals)
+        keys = self._get_sales_daily_keys() if touched else set()
+        res = super(MarketplaceCommission, self).write(vals)
+        if touched:
+            keys |= self._get_sales_daily_keys()
+            self.env['marketplace.vendor.sales.daily']._schedule_refresh(keys)
+        return res
+
+    def unlink(self):
+        self.env['marketplace.vendor.sales.daily']._schedule_refresh(self._get_sales_daily_keys())
+        return super(MarketplaceCommission, self).unlink()
+
+    @api.model
+    def _get_vendor_totals(self, vendor):
+        """ Income figures of ``vendor`` from a single grouped query:
+        ``{'total_earnings', 'total_commission', 'net_income', 'available_balance'}``
+        """
+        groups = self._read_group(
+            [('vendor_id', '=', vendor.id), ('state', 'in', ['confirmed', 'paid'])],
+            ['state'], ['sale_amount:sum', 'amount_commission:sum', 'vendor_amount:sum'],
+        )
+        totals = {state: (sale or 0.0, commission or 0.0, net or 0.0) for state, sale, commission, net in groups}
+        confirmed = totals.get('confirmed', (0.0, 0.0, 0.0))
+        paid = totals.get('paid', (0.0, 0.0, 0.0))
+        total_earnings = confirmed[0] + paid[0]
+        total_commission = confirmed[1] + paid[1]
+        return {
+            'total_earnings': total_earnings,
+            'total_commission': total_commission,
+            'net_income': total_earnings - total_commission,
+            # Earned (confirmed + paid) minus already paid out
+            'available_balance': confirmed[2],
+        }
+
+    def _get_sales_daily_keys(self):
+        """ (vendor_id, order day) rows of the daily sales rollup these commissions count in """
+        return {
+            (commission.vendor_id.id, commission.order_line_id.order_id.date_order.date())
+            for commission in self.sudo()
+            if commission.vendor_id and commission.order_line_id.order_id.date_order
+        }
\ No newline at end of file
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+from odoo.http import request
+from odoo.tools.func import lazy
+
+
+class IrQWeb(models.AbstractModel):
+    _inherit = 'ir.qweb'
+
+    def _prepare_environment(self, values):
+        irQweb = super()._prepare_environment(values)
+        if request and not self.env.context.get('minimal_qcontext'):
+            # Product cards test ``product.id in wishlist_product_ids``: the ids are
+            # only queried if a card is rendered, and once per request
+            values.setdefault('wishlist_product_ids', lazy(
+                self.env['product.wishlist'].sudo()._get_wishlist_product_tmpl_ids
+            ))
+        return irQweb
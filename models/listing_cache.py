@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import threading
+
+from odoo import models, api
+from odoo.tools.lru import LRU
+
+
+class CountingLRU(object):
+    """ Size-bounded LRU mapping that counts hits and misses """
+
+    def __init__(self, size):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._data = LRU(size)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        value = self._data.get(key, default)
+        with self._lock:
+            if value is default:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# One cache per worker process; entries are keyed on the catalog generation so
+# a bump (from any worker) makes every older entry unreachable until evicted
+_listing_cache = CountingLRU(2048)
+
+
+class MarketplaceListingCache(models.AbstractModel):
+    _name = 'marketplace.listing.cache'
+    _description = 'Storefront Listing Cache'
+
+    # Bumped after every commit that changes what the storefront listings show
+    _GENERATION_SEQUENCE = 'marketplace_catalog_generation_seq'
+
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % self._GENERATION_SEQUENCE)
+        # A new sequence is not "called": its first nextval() returns last_value
+        # unchanged, so the first invalidation would not change the generation
+        self.env.cr.execute("SELECT setval('{0}', last_value, true) FROM {0} WHERE NOT is_called".format(
+            self._GENERATION_SEQUENCE
+        ))
+
+    @api.model
+    def _get_generation(self):
+        """ Current catalog generation (not transactional, visible to all workers at once) """
+        self.env.cr.execute("SELECT last_value FROM %s" % self._GENERATION_SEQUENCE)
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _make_key(self, *parts):
+        """ Compact hashable key for arbitrary parts (domains, orders...) """
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    @api.model
+    def _get_or_compute(self, namespace, key, compute):
+        """ Return the cached value of ``key`` or store the result of ``compute()``.
+
+        Cached values are shared between requests: they must only hold plain
+        data (ids, numbers, strings), never records, and must not be modified.
+        """
+        full_key = (self.env.cr.dbname, namespace, self._get_generation(), key)
+        value = _listing_cache.get(full_key)
+        if value is None:
+            value = compute()
+            _listing_cache[full_key] = value
+        return value
+
+    @api.model
+    def _invalidate(self):
+        """ Drop every cached listing once the current transaction commits """
+        cr = self.env.cr
+        if cr.postcommit.data.get('marketplace_listing_cache_bump'):
+            return
+        cr.postcommit.data['marketplace_listing_cache_bump'] = True
+
+        # After commit only: bumping earlier would let a concurrent request
+        # cache pre-commit data under the new generation
+        registry = self.env.registry
+        sequence = self._GENERATION_SEQUENCE
+
+        @cr.postcommit.add
+        def bump_generation():
+            with registry.cursor() as bump_cr:
+                bump_cr.execute("SELECT nextval('%s')" % sequence)
+
+    @api.model
+    def _get_stats(self):
+        """ Size and hit/miss counters of this worker's cache """
+        return _listing_cache.stats()
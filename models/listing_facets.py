@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from odoo import models, api
+from odoo.tools.sql import SQL
+
+
+class MarketplaceListingFacets(models.AbstractModel):
+    _name = 'marketplace.listing.facets'
+    _description = 'Storefront Listing Facets'
+
+    # Upper bounds of the price buckets, the last bucket is open-ended (200+)
+    _PRICE_BUCKETS = [50, 100, 200]
+
+    @api.model
+    def _get_facets(self, domain):
+        """ Vendor, category and price-bucket counts of the published products matching ``domain``.
+
+        Returns a dict of lists: ``vendors`` / ``categories`` entries are
+        ``{'id', 'name', 'count'}``, ``prices`` entries ``{'min', 'max', 'count'}``.
+        The result is shared between requests and must not be modified.
+        """
+        Cache = self.env['marketplace.listing.cache']
+        key = Cache._make_key(self.env.lang, domain)
+        return Cache._get_or_compute('facets', key, lambda: self._compute_facets(domain))
+
+    @api.model
+    def _compute_facets(self, domain):
+        """ Count all facets with one grouped query instead of loading the products """
+        ProductTemplate = self.env['product.template'].sudo()
+        query = ProductTemplate._search(domain)
+
+        # One pass, three groupings: per vendor, per category and per price bucket.
+        # COUNT(DISTINCT) because the category join repeats products.
+        self.env.cr.execute(SQL("""
+            WITH matching AS (
+                SELECT tmpl.id, tmpl.vendor_id,
+                       width_bucket(tmpl.list_price, %s::numeric[]) AS price_bucket
+                  FROM product_template tmpl
+                 WHERE tmpl.id IN (%s)
+            )
+            SELECT matching.vendor_id,
+                   rel.product_public_category_id,
+                   matching.price_bucket,
+                   COUNT(DISTINCT matching.id),
+                   GROUPING(matching.vendor_id),
+                   GROUPING(rel.product_public_category_id)
+              FROM matching
+              LEFT JOIN product_public_category_product_template_rel rel
+                ON rel.product_template_id = matching.id
+          GROUP BY GROUPING SETS ((matching.vendor_id), (rel.product_public_category_id), (matching.price_bucket))
+        """, self._PRICE_BUCKETS, query.select()))
+
+        vendor_counts, category_counts, bucket_counts = {}, {}, {}
+        for vendor_id, category_id, bucket, count, vendor_grouping, category_grouping in self.env.cr.fetchall():
+            if not vendor_grouping:
+                if vendor_id:
+                    vendor_counts[vendor_id] = count
+            elif not category_grouping:
+                if category_id:
+                    category_counts[category_id] = count
+            else:
+                bucket_counts[bucket] = count
+
+        vendors = self.env['marketplace.vendor'].sudo().browse(vendor_counts)
+        categories = self.env['product.public.category'].sudo().browse(category_counts)
+        bounds = [0] + self._PRICE_BUCKETS + [None]
+        return {
+            'vendors': sorted(
+                ({'id': v.id, 'name': v.shop_name, 'count': vendor_counts[v.id]} for v in vendors),
+                key=lambda facet: (-facet['count'], facet['name'] or ''),
+            ),
+            'categories': sorted(
+                ({'id': c.id, 'name': c.name, 'count': category_counts[c.id]} for c in categories),
+                key=lambda facet: (-facet['count'], facet['name'] or ''),
+            ),
+            # width_bucket numbers buckets from 0 (below the first bound) to len(bounds)
+            'prices': [
+                {'min': bounds[index], 'max': bounds[index + 1], 'count': bucket_counts.get(index, 0)}
+                for index in range(len(self._PRICE_BUCKETS) + 1)
+            ],
+        }
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+from odoo import models, api
+
+from .listing_cache import CountingLRU
+
+
+# Rendered pages of this worker, keyed on the generations of their tags
+_page_cache = CountingLRU(256)
+
+
+class MarketplacePageCache(models.AbstractModel):
+    _name = 'marketplace.page.cache'
+    _description = 'Storefront Page Cache'
+
+    # One generation sequence per invalidation tag. 'catalog' is shared with the
+    # listing cache, so product / category / vendor changes also drop the pages.
+    _TAG_SEQUENCES = {
+        'catalog': 'marketplace_catalog_generation_seq',
+        'blog': 'marketplace_blog_generation_seq',
+        'content': 'marketplace_content_generation_seq',
+    }
+
+    def init(self):
+        for sequence in self._TAG_SEQUENCES.values():
+            self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % sequence)
+            # Mark new sequences as called, or their first bump keeps last_value (see listing cache)
+            self.env.cr.execute("SELECT setval('{0}', last_value, true) FROM {0} WHERE NOT is_called".format(sequence))
+
+    @api.model
+    def _get_generations(self, tags):
+        """ Current generation of each tag, read in a single query """
+        tags = sorted(set(tags))
+        self.env.cr.execute("SELECT %s" % ", ".join(
+            "(SELECT last_value FROM %s)" % self._TAG_SEQUENCES[tag] for tag in tags
+        ))
+        return tuple(zip(tags, self.env.cr.fetchone()))
+
+    @api.model
+    def _make_key(self, tags, key):
+        """ Full cache key of ``key``. Build it once, before rendering, so the page
+        is stored under the generations that were current when rendering started.
+        """
+        return (self.env.cr.dbname, self._get_generations(tags), key)
+
+    @api.model
+    def _get(self, full_key):
+        return _page_cache.get(full_key)
+
+    @api.model
+    def _set(self, full_key, page):
+        """ Store a rendered page: a dict of plain data (body bytes, etag, dates) """
+        _page_cache[full_key] = page
+
+    @api.model
+    def _invalidate(self, *tags):
+        """ Drop the pages depending on ``tags`` once the current transaction commits """
+        cr = self.env.cr
+        sequences = {self._TAG_SEQUENCES[tag] for tag in tags} - cr.postcommit.data.setdefault(
+            'marketplace_page_cache_bump', set()
+        )
+        if not sequences:
+            return
+        cr.postcommit.data['marketplace_page_cache_bump'].update(sequences)
+
+        # Same as the listing cache: bump after commit so no concurrent request
+        # stores pre-commit output under the new generation
+        registry = self.env.registry
+
+        @cr.postcommit.add
+        def bump_generations():
+            with registry.cursor() as bump_cr:
+                for sequence in sorted(sequences):
+                    bump_cr.execute("SELECT nextval('%s')" % sequence)
+
+    @api.model
+    def _get_stats(self):
+        """ Size and hit/miss counters of this worker's page cache """
+        return _page_cache.stats()
+
+
+class IrUiView(models.Model):
+    _inherit = 'ir.ui.view'
+
+    # Cached pages embed the rendered layout, templates and snippets
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env['marketplace.page.cache']._invalidate('content')
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env['marketplace.page.cache']._invalidate('content')
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['marketplace.page.cache']._invalidate('content')
+        return super().unlink()
+
+
+class WebsiteMenu(models.Model):
+    _inherit = 'website.menu'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env['marketplace.page.cache']._invalidate('content')
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env['marketplace.page.cache']._invalidate('content')
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['marketplace.page.cache']._invalidate('content')
+        return super().unlink()
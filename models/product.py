@@ -1,5 +1,12 @@
 # -*- coding: utf-8 -*-
+import base64
+import json
+import re
+from datetime import datetime
+
 from odoo import models, fields, api
+from odoo.osv import expression
+from odoo.tools.sql import SQL, column_exists, create_column, create_index, drop_index
 
 class ProductTemplate(models.Model):
     _inherit = 'product.template'
@@ -22,14 +29,107 @@ class ProductTemplate(models.Model):
         string="Taux de Commission Spécifique (%)",
         help="Laisser à 0.0 pour utiliser le taux par défaut du vendeur."
     )
+
+    # Search-only field: matches the full-text document kept in the
+    # marketplace_search_tsv column (name, description, vendor, categories)
+    marketplace_text_search = fields.Char(
+        string="Recherche plein texte",
+        compute='_compute_marketplace_text_search',
+        search='_search_marketplace_text_search'
+    )
+
+    # Content hash of the main image: versions the storefront image URLs so they
+    # can be cached for a year, and tells whether there is an image without
+    # loading it (product.image_1920 reads the whole file)
+    marketplace_image_checksum = fields.Char(
+        string="Empreinte de l'image",
+        compute='_compute_marketplace_image_checksum'
+    )
     
-    @api.model
-    def create(self, vals):
+    # Storefront sort options: every spec ends with 'id' so the order is total
+    # and a page can be resumed from the last row (keyset / seek pagination)
+    _LISTING_SORTS = {
+        'default': [('website_sequence', 'asc'), ('create_date', 'desc'), ('id', 'desc')],
+        'popular': [('website_sequence', 'asc'), ('create_date', 'desc'), ('id', 'desc')],
+        'price_asc': [('list_price', 'asc'), ('id', 'asc')],
+        'price_desc': [('list_price', 'desc'), ('id', 'desc')],
+        'name_asc': [('name', 'asc'), ('id', 'asc')],
+        'newest': [('create_date', 'desc'), ('id', 'desc')],
+    }
+
+    # Partial indexes matching _LISTING_SORTS (desc sorts use a backward scan).
+    # No index for 'name_asc': the ORM sorts the translated name on
+    # COALESCE(name->>lang, name->>'en_US'), which depends on the request language.
+    _LISTING_INDEXES = {
+        'product_template_listing_sequence_idx': ['website_sequence', 'create_date DESC', 'id DESC'],
+        'product_template_listing_price_idx': ['list_price', 'id'],
+        'product_template_listing_newest_idx': ['create_date DESC', 'id DESC'],
+        'product_template_listing_vendor_price_idx': ['vendor_id', 'list_price', 'id'],
+    }
+
+    # Fields that change product.public.category.published_product_count
+    _CATEGORY_COUNT_FIELDS = {'is_published', 'website_published', 'active', 'public_categ_ids'}
+
+    # Fields shown or filtered on by the cached storefront listings and facets
+    _LISTING_CACHE_FIELDS = {
+        'name', 'description_sale', 'list_price', 'website_sequence', 'vendor_id',
+        'is_published', 'website_published', 'active', 'public_categ_ids',
+    }
+
+    # Fields indexed in the full-text search document
+    _SEARCH_DOCUMENT_FIELDS = {'name', 'description_sale', 'vendor_id', 'public_categ_ids'}
+
+    # Full-text document: weights rank name matches first, then vendor and
+    # categories, then the description. Translated fields index every language.
+    _SEARCH_DOCUMENT_QUERY = """
+        UPDATE product_template tmpl
+           SET marketplace_search_tsv =
+                   setweight(to_tsvector('simple', COALESCE(
+                       (SELECT string_agg(value, ' ') FROM jsonb_each_text(tmpl.name)), '')), 'A')
+                || setweight(to_tsvector('simple', COALESCE(
+                       (SELECT vendor.shop_name FROM marketplace_vendor vendor WHERE vendor.id = tmpl.vendor_id), '')), 'B')
+                || setweight(to_tsvector('simple', COALESCE(
+                       (SELECT string_agg(names.value, ' ')
+                          FROM product_public_category_product_template_rel rel
+                          JOIN product_public_category categ ON categ.id = rel.product_public_category_id,
+                               jsonb_each_text(categ.name) names
+                         WHERE rel.product_template_id = tmpl.id), '')), 'B')
+                || setweight(to_tsvector('simple', COALESCE(
+                       (SELECT string_agg(value, ' ') FROM jsonb_each_text(tmpl.description_sale)), '')), 'C')
+    """
+
+    @api.model_create_multi
+    def create(self, vals_list):
         # Ensure marketplace products have inventory tracking enabled
-        if vals.get('vendor_id'):
-            if 'type' not in vals:
-                vals['type'] = 'product'  # Make it storable (not service)
-        return super(ProductTemplate, self).create(vals)
+        for vals in vals_list:
+            if vals.get('vendor_id'):
+                if 'type' not in vals:
+                    vals['type'] = 'product'  # Make it storable (not service)
+        # Batched: one category recount, search document refresh and cache bump for all
+        products = super(ProductTemplate, self).create(vals_list)
+        products.filtered('is_published').public_categ_ids._refresh_published_product_count()
+        products._refresh_search_document()
+        self.env['marketplace.listing.cache']._invalidate()
+        return products
+
+    def write(self, vals):
+        # Categories the products leave must be recounted too
+        old_categories = self.public_categ_ids if self._CATEGORY_COUNT_FIELDS.intersection(vals) else None
+        res = super(ProductTemplate, self).write(vals)
+        if old_categories is not None:
+            (old_categories | self.public_categ_ids)._refresh_published_product_count()
+        if self._SEARCH_DOCUMENT_FIELDS.intersection(vals):
+            self._refresh_search_document()
+        if self._LISTING_CACHE_FIELDS.intersection(vals):
+            self.env['marketplace.listing.cache']._invalidate()
+        return res
+
+    def unlink(self):
+        categories = self.public_categ_ids
+        res = super(ProductTemplate, self).unlink()
+        categories._refresh_published_product_count()
+        self.env['marketplace.listing.cache']._invalidate()
+        return res
 
     @api.onchange('vendor_id')
     def _onchange_vendor_id(self):
@@ -75,4 +175,255 @@ class ProductTemplate(models.Model):
                     body=f"Your product '{product.name}' has been rejected. Please review and resubmit.",
                     subject="Product Rejected",
                     partner_ids=[product.vendor_id.partner_id.id]
-                )
\ No newline at end of file
+                )
+
+    def _auto_init(self):
+        res = super(ProductTemplate, self)._auto_init()
+        for index_name, expressions in self._LISTING_INDEXES.items():
+            create_index(self._cr, index_name, self._table, expressions, where='is_published')
+        # Index on name->>'en_US' created by earlier versions, never used by the name sort
+        drop_index(self._cr, 'product_template_listing_name_idx', self._table)
+
+        # tsvector is not an ORM field type: the column is managed here and in _refresh_search_document
+        if not column_exists(self._cr, self._table, 'marketplace_search_tsv'):
+            create_column(self._cr, self._table, 'marketplace_search_tsv', 'tsvector')
+        create_index(self._cr, 'product_template_search_tsv_idx', self._table, ['marketplace_search_tsv'], method='gin')
+        return res
+
+    def init(self):
+        super(ProductTemplate, self).init()
+        # Index the products of existing databases on install / upgrade
+        self.env.cr.execute(self._SEARCH_DOCUMENT_QUERY + " WHERE tmpl.marketplace_search_tsv IS NULL", ())
+
+    # ------------------------------------------------------------
+    # FULL-TEXT SEARCH
+    # ------------------------------------------------------------
+
+    def _compute_marketplace_text_search(self):
+        self.marketplace_text_search = False
+
+    def _search_marketplace_text_search(self, operator, value):
+        if operator not in ('=', 'ilike') or not isinstance(value, str):
+            raise NotImplementedError("Unsupported search operator %r on marketplace_text_search" % operator)
+        tsquery = self._get_search_tsquery(value)
+        if not tsquery:
+            return expression.FALSE_DOMAIN
+        # Subquery on the GIN index, e.g. "WHERE id IN (SELECT id ... WHERE tsv @@ query)"
+        query = self.with_context(active_test=False)._search([])
+        query.add_where(SQL(
+            "%s @@ to_tsquery('simple', %s)",
+            SQL.identifier(self._table, 'marketplace_search_tsv'), tsquery
+        ))
+        return [('id', 'in', query)]
+
+    @api.model
+    def _get_search_tsquery(self, text):
+        """ Prefix query from user input: 'red bag' -> 'red:* & bag:*' """
+        words = re.findall(r'\w+', (text or '').lower())[:8]
+        return ' & '.join('%s:*' % word for word in words)
+
+    @api.model
+    def _search_ranked(self, domain, text, limit=None, offset=0):
+        """ Products matching ``domain``, best full-text matches for ``text`` first.
+
+        ``domain`` is expected to contain ``('marketplace_text_search', '=', text)``.
+        """
+        tsquery = self._get_search_tsquery(text)
+        if not tsquery:
+            return self.search(domain, limit=limit, offset=offset, order=self._get_listing_order('default'))
+        query = self._search(domain, limit=limit, offset=offset)
+        query.order = SQL(
+            "ts_rank_cd(%s, to_tsquery('simple', %s)) DESC, %s DESC",
+            SQL.identifier(self._table, 'marketplace_search_tsv'), tsquery,
+            SQL.identifier(self._table, 'id'),
+        )
+        self.env.cr.execute(query.select())
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    def _refresh_search_document(self):
+        """ Rebuild the full-text document of these products """
+        if not self.ids:
+            return
+        self.flush_recordset(['name', 'description_sale', 'vendor_id', 'public_categ_ids'])
+        self.env['marketplace.vendor'].flush_model(['shop_name'])
+        self.env['product.public.category'].flush_model(['name'])
+        self.env.cr.execute(self._SEARCH_DOCUMENT_QUERY + " WHERE tmpl.id IN %s", [tuple(self.ids)])
+
+    # ------------------------------------------------------------
+    # STOREFRONT LISTINGS (keyset pagination)
+    # ------------------------------------------------------------
+
+    @api.model
+    def _get_listing_order(self, sort, reverse=False):
+        """ ORDER BY clause of a storefront sort, optionally reversed """
+        spec = self._LISTING_SORTS.get(sort) or self._LISTING_SORTS['default']
+        flip = {'asc': 'desc', 'desc': 'asc'}
+        return ', '.join('%s %s' % (fname, flip[direction] if reverse else direction) for fname, direction in spec)
+
+    def _encode_listing_cursor(self, sort):
+        """ Opaque cursor pointing at this product's position in the given sort """
+        self.ensure_one()
+        spec = self._LISTING_SORTS.get(sort) or self._LISTING_SORTS['default']
+        values = []
+        for fname, _direction in spec:
+            value = self[fname]
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            values.append(value)
+        payload = json.dumps([sort, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @api.model
+    def _decode_listing_cursor(self, cursor, sort):
+        """ Sort values stored in a cursor, or None if it is invalid or made for another sort """
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            cursor_sort, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            return None
+        spec = self._LISTING_SORTS.get(sort) or self._LISTING_SORTS['default']
+        if cursor_sort != sort or not isinstance(values, list) or len(values) != len(spec) or None in values:
+            return None
+        return values
+
+    def _get_listing_keyset_condition(self, query, sort, values, reverse=False):
+        """ WHERE clause selecting the rows after ``values`` in the given sort.
+
+        For ``a asc, b desc, id desc`` it builds
+        ``a > va OR (a = va AND (b < vb OR (b = vb AND id < vid)))``
+        """
+        spec = self._LISTING_SORTS.get(sort) or self._LISTING_SORTS['default']
+        condition = None
+        for (fname, direction), value in reversed(list(zip(spec, values))):
+            column = self._field_to_sql(self._table, fname, query)
+            operator = SQL('>') if (direction == 'asc') != reverse else SQL('<')
+            after = SQL("%s %s %s", column, operator, value)
+            if condition is None:
+                condition = after
+            else:
+                condition = SQL("(%s OR (%s = %s AND %s))", after, column, value, condition)
+        return condition
+
+    @api.model
+    def _search_listing_page(self, domain, sort='default', limit=10, after=None, before=None):
+        """ Keyset (seek) pagination for storefront listings.
+
+        Instead of OFFSET, the page starts right after (or before) the row a
+        cursor points to, so every page costs one index range scan and no
+        count is needed. Returns ``(products, next_cursor, prev_cursor)``;
+        cursors are False when there is nothing further in that direction.
+        """
+        sort = sort if sort in self._LISTING_SORTS else 'default'
+        values = self._decode_listing_cursor(before or after, sort)
+        backward = bool(before) and values is not None
+
+        # Fetch one extra row to know whether another page follows
+        query = self._search(domain, limit=limit + 1, order=self._get_listing_order(sort, reverse=backward))
+        if values:
+            query.add_where(self._get_listing_keyset_condition(query, sort, values, reverse=backward))
+        self.env.cr.execute(query.select())
+        ids = [row[0] for row in self.env.cr.fetchall()]
+
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        if backward:
+            ids.reverse()
+        products = self.browse(ids)
+        if not products:
+            return products, False, False
+
+        if backward:
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, bool(values)
+        next_cursor = products[-1]._encode_listing_cursor(sort) if has_next else False
+        prev_cursor = products[0]._encode_listing_cursor(sort) if has_prev else False
+        return products, next_cursor, prev_cursor
+
+    @api.model
+    def _search_read_listing_page(self, domain, fields, sort='default', limit=20, after=None, text=None):
+        """ Compact listing page for the JSON API: ``(rows, next_cursor)``.
+
+        Only ``fields`` (plus the sort keys) are read. Sorts continue from a
+        keyset cursor like _search_listing_page; 'relevance' (with ``text``)
+        is ranked, so its cursor carries the offset of the next page.
+        """
+        if sort == 'relevance' and text:
+            offset = self._decode_listing_offset(after)
+            ids = self._search_ranked(domain, text, limit=limit + 1, offset=offset).ids
+            has_more = len(ids) > limit
+            next_cursor = self._encode_listing_offset(offset + limit) if has_more else False
+            ids = ids[:limit]
+            sort_fields = []
+        else:
+            if sort not in self._LISTING_SORTS:
+                sort = 'default'
+            values = self._decode_listing_cursor(after, sort)
+            query = self._search(domain, limit=limit + 1, order=self._get_listing_order(sort))
+            if values:
+                query.add_where(self._get_listing_keyset_condition(query, sort, values))
+            self.env.cr.execute(query.select())
+            ids = [row[0] for row in self.env.cr.fetchall()]
+            has_more = len(ids) > limit
+            ids = ids[:limit]
+            sort_fields = [fname for fname, _direction in self._LISTING_SORTS[sort]]
+            next_cursor = False
+
+        rows = self.search_read([('id', 'in', ids)], list(dict.fromkeys(list(fields) + sort_fields)))
+        position = {product_id: index for index, product_id in enumerate(ids)}
+        rows.sort(key=lambda row: position[row['id']])
+        if sort_fields and has_more:
+            # The sort keys are in the cache now: encoding reads no more rows
+            next_cursor = self.browse(ids[-1])._encode_listing_cursor(sort)
+        return rows, next_cursor
+
+    @api.model
+    def _encode_listing_offset(self, offset):
+        payload = json.dumps(['relevance', [offset]], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @api.model
+    def _decode_listing_offset(self, cursor):
+        """ Offset stored in a 'relevance' cursor, 0 if missing or invalid """
+        if not cursor:
+            return 0
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            cursor_sort, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            return 0
+        if cursor_sort != 'relevance' or not isinstance(values, list) or len(values) != 1:
+            return 0
+        return max(int(values[0]), 0) if isinstance(values[0], int) else 0
+
+    # ------------------------------------------------------------
+    # STOREFRONT IMAGES
+    # ------------------------------------------------------------
+
+    def _compute_marketplace_image_checksum(self):
+        # One query for the whole prefetch set (a listing page), not one per card
+        checksums = {
+            attachment['res_id']: attachment['checksum']
+            for attachment in self.env['ir.attachment'].sudo().search_read([
+                ('res_model', '=', 'product.template'),
+                ('res_field', '=', 'image_1920'),
+                ('res_id', 'in', self.ids),
+            ], ['res_id', 'checksum'])
+        }
+        for product in self:
+            product.marketplace_image_checksum = checksums.get(product.id, False)
+
+    def _get_marketplace_image_url(self, size=512):
+        """ URL of the ``image_<size>`` variant (128, 512 or 1024) of the main image.
+
+        The content hash in ``unique`` makes /web/image answer with a one-year
+        immutable Cache-Control (and the attachment checksum as ETag), while a
+        new image gets a new URL.
+        """
+        self.ensure_one()
+        url = '/web/image/product.template/%s/image_%s' % (self.id, size)
+        if self.marketplace_image_checksum:
+            url += '?unique=%s' % self.marketplace_image_checksum[:12]
+        return url
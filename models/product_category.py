@@ -13,4 +13,80 @@ class ProductPublicCategory(models.Model):
     seo_description = fields.Text(string='SEO Description')
     is_featured = fields.Boolean(string='Featured Category', default=False)
     
-    icon_class = fields.Char(string='Icon Class', help='Font Awesome icon class (e.g., fa-laptop)')
\ No newline at end of file
+    icon_class = fields.Char(string='Icon Class', help='Font Awesome icon class (e.g., fa-laptop)')
+
+    # Maintained by product.template writes (see _refresh_published_product_count),
+    # so /categories does not need one child_of count per category
+    published_product_count = fields.Integer(
+        string='Published Products',
+        readonly=True,
+        default=0,
+        help='Number of published products in this category or any of its sub-categories.'
+    )
+
+    # Count of distinct published products linked to a category or one of its descendants
+    _COUNT_QUERY = """
+        UPDATE product_public_category cat
+           SET published_product_count = (
+                SELECT COUNT(DISTINCT rel.product_template_id)
+                  FROM product_public_category child
+                  JOIN product_public_category_product_template_rel rel
+                    ON rel.product_public_category_id = child.id
+                  JOIN product_template tmpl
+                    ON tmpl.id = rel.product_template_id
+                 WHERE child.parent_path LIKE cat.parent_path || '%%'
+                   AND tmpl.is_published
+                   AND tmpl.active
+           )
+    """
+
+    def init(self):
+        # Fill the counter for existing databases on install / upgrade
+        self._rebuild_published_product_count()
+
+    def write(self, vals):
+        # Moving a category changes the totals of its old and new parents
+        old_parents = self.parent_id if 'parent_id' in vals else None
+        res = super().write(vals)
+        if old_parents is not None:
+            (old_parents | self.parent_id | self)._refresh_published_product_count()
+        if 'name' in vals:
+            # Category names are part of the products' full-text search document
+            self.env['product.template'].sudo().with_context(active_test=False).search([
+                ('public_categ_ids', 'in', self.ids)
+            ])._refresh_search_document()
+        self.env['marketplace.listing.cache']._invalidate()
+        return res
+
+    def unlink(self):
+        parents = self.parent_id - self
+        res = super().unlink()
+        parents.exists()._refresh_published_product_count()
+        self.env['marketplace.listing.cache']._invalidate()
+        return res
+
+    def _refresh_published_product_count(self):
+        """ Recount published products for these categories and all their parents """
+        categories = self.sudo().exists()
+        if not categories:
+            return
+        categories.flush_model(['parent_path'])
+        self.env['product.template'].flush_model(['is_published', 'active', 'public_categ_ids'])
+
+        # parent_path is '1/4/9/': every id in it is an ancestor (or the category itself)
+        category_ids = {
+            int(category_id)
+            for path in categories.mapped('parent_path')
+            for category_id in (path or '').split('/') if category_id
+        }
+        self.env.cr.execute(self._COUNT_QUERY + " WHERE cat.id IN %s", [tuple(category_ids)])
+        self.invalidate_model(['published_product_count'])
+
+    @api.model
+    def _rebuild_published_product_count(self):
+        """ Recount every category (used on upgrade and by the 'Rebuild Product Counts' action) """
+        self.flush_model(['parent_path'])
+        self.env['product.template'].flush_model(['is_published', 'active', 'public_categ_ids'])
+        self.env.cr.execute(self._COUNT_QUERY, ())
+        self.invalidate_model(['published_product_count'])
+        return True
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import logging
+
+from odoo import models, api, _
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+class MarketplaceProductImport(models.AbstractModel):
+    _name = 'marketplace.product.import'
+    _description = 'Import de produits vendeur'
+
+    # Columns of the import file (first row), 'name' and 'price' are required,
+    # other columns are ignored
+    _COLUMNS = ('name', 'sku', 'price', 'compare_price', 'description', 'category', 'weight', 'quantity', 'is_published')
+
+    # Products created per create() call / savepoint
+    _BATCH_SIZE = 200
+
+    # Rows read from one file
+    _MAX_ROWS = 20000
+
+    # Errors listed in the report (the count is always complete)
+    _MAX_REPORTED_ERRORS = 200
+
+    @api.model
+    def _read_rows(self, filename, stream):
+        """ Yield ``(row number, {column: text})`` from a CSV or XLSX file, one row at a time """
+        if (filename or '').lower().endswith('.xlsx'):
+            if openpyxl is None:
+                raise ValueError(_("XLSX files cannot be read on this server, please upload a CSV file."))
+            # read_only streams the sheet instead of loading it whole
+            workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+            try:
+                rows = workbook.worksheets[0].iter_rows(values_only=True)
+                header = [str(cell or '').strip().lower() for cell in next(rows, ())]
+                for number, row in enumerate(rows, start=2):
+                    values = ['' if cell is None else str(cell).strip() for cell in row]
+                    if any(values):
+                        yield number, dict(zip(header, values))
+            finally:
+                workbook.close()
+            return
+
+        reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        header = [column.strip().lower() for column in next(reader, [])]
+        for number, row in enumerate(reader, start=2):
+            values = [value.strip() for value in row]
+            if any(values):
+                yield number, dict(zip(header, values))
+
+    @api.model
+    def _parse_number(self, text, label):
+        try:
+            return float(text.replace(',', '.')) if text else 0.0
+        except ValueError:
+            raise ValueError(_("%(column)s must be a number, got '%(value)s'", column=label, value=text))
+
+    @api.model
+    def _prepare_row(self, vendor, row, categories, skus):
+        """ Product values and quantity of one row, or a ValueError explaining what is wrong """
+        name = row.get('name')
+        if not name:
+            raise ValueError(_("The name is required"))
+        if not row.get('price'):
+            raise ValueError(_("The price is required"))
+        price = self._parse_number(row['price'], 'price')
+        if price < 0:
+            raise ValueError(_("The price cannot be negative"))
+
+        vals = {
+            'name': name,
+            'description_sale': row.get('description') or False,
+            'list_price': price,
+            'is_storable': True,
+            'vendor_id': vendor.id,
+            'approval_state': 'pending',
+            'is_published': (row.get('is_published') or '').lower() in ('1', 'true', 'yes', 'oui', 'on'),
+        }
+
+        sku = row.get('sku')
+        if sku:
+            if sku in skus:
+                raise ValueError(_("SKU '%s' is already used by another of your products or rows", sku))
+            skus.add(sku)
+            vals['default_code'] = sku
+
+        if row.get('category'):
+            category_id = categories.get(row['category'].lower())
+            if not category_id:
+                raise ValueError(_("Unknown category '%s'", row['category']))
+            vals['public_categ_ids'] = [(4, category_id)]
+
+        if row.get('compare_price'):
+            vals['compare_list_price'] = self._parse_number(row['compare_price'], 'compare_price')
+        if row.get('weight'):
+            vals['weight'] = self._parse_number(row['weight'], 'weight')
+
+        quantity = self._parse_number(row.get('quantity'), 'quantity')
+        if quantity < 0:
+            raise ValueError(_("The quantity cannot be negative"))
+        return vals, quantity
+
+    @api.model
+    def _import_products(self, vendor, filename, stream, website=None, location_id=None):
+        """ Create the products of an uploaded file for ``vendor``.
+
+        Rows are read one at a time and validated, valid rows are created
+        ``_BATCH_SIZE`` at a time with their stock set in ``location_id``.
+        Invalid rows are skipped and reported:
+        ``{'created': int, 'error_count': int, 'errors': [(row number, message)]}``.
+        """
+        ProductTemplate = self.env['product.template'].sudo()
+        report = {'created': 0, 'error_count': 0, 'errors': []}
+
+        def add_error(number, message):
+            report['error_count'] += 1
+            if len(report['errors']) < self._MAX_REPORTED_ERRORS:
+                report['errors'].append((number, message))
+
+        # Lookups loaded once: categories by id and by name, the vendor's SKUs
+        categories = {}
+        for category in self.env['product.public.category'].sudo().search_read([], ['name']):
+            categories[str(category['id'])] = category['id']
+            categories.setdefault(category['name'].lower(), category['id'])
+        skus = set(ProductTemplate.with_context(active_test=False).search([
+            ('vendor_id', '=', vendor.id), ('default_code', '!=', False)
+        ]).mapped('default_code'))
+
+        batch = []
+        for number, row in self._read_rows(filename, stream):
+            if number - 1 > self._MAX_ROWS:
+                add_error(number, _("Too many rows: only the first %s are imported", self._MAX_ROWS))
+                break
+            try:
+                vals, quantity = self._prepare_row(vendor, row, categories, skus)
+            except ValueError as e:
+                add_error(number, str(e))
+                continue
+            if website:
+                vals['website_id'] = website.id
+            batch.append((number, vals, quantity))
+            if len(batch) >= self._BATCH_SIZE:
+                self._create_batch(batch, location_id, report, add_error)
+                batch = []
+        if batch:
+            self._create_batch(batch, location_id, report, add_error)
+        return report
+
+    @api.model
+    def _create_batch(self, batch, location_id, report, add_error):
+        """ Create one batch of products and their stock in one go. If the batch
+        fails, its rows are retried one by one and only the failing rows are reported.
+        """
+        try:
+            with self.env.cr.savepoint():
+                self._create_products(batch, location_id)
+            report['created'] += len(batch)
+        except Exception as e:
+            _logger.info("Product import batch failed, retrying its rows one by one: %s", e)
+            for row in batch:
+                try:
+                    with self.env.cr.savepoint():
+                        self._create_products([row], location_id)
+                    report['created'] += 1
+                except Exception as row_error:
+                    add_error(row[0], _("Not imported: %s", row_error))
+        # Keep the memory flat: the created records are not needed anymore
+        self.env.invalidate_all()
+
+    @api.model
+    def _create_products(self, rows, location_id):
+        """ Create the products of ``rows`` (row number, vals, quantity) with their stock """
+        products = self.env['product.template'].sudo().create([vals for _number, vals, _qty in rows])
+        if location_id:
+            self.env['stock.quant']._marketplace_set_quantities(location_id, {
+                product.product_variant_id.id: quantity
+                for product, (_number, _vals, quantity) in zip(products, rows)
+                if quantity > 0
+            })
+        return products
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import models, fields, api
+from odoo.tools.sql import SQL, create_index
+
+_logger = logging.getLogger(__name__)
+
+
+class MarketplaceProductRelated(models.Model):
+    _name = 'marketplace.product.related'
+    _description = 'Produits recommandés'
+    _order = 'product_tmpl_id, sequence'
+
+    product_tmpl_id = fields.Many2one('product.template', string="Produit", required=True, ondelete='cascade')
+    related_tmpl_id = fields.Many2one('product.template', string="Produit recommandé", required=True, ondelete='cascade')
+    sequence = fields.Integer(string="Rang", default=1)
+    score = fields.Float(string="Score")
+
+    _sql_constraints = [
+        ('unique_product_related', 'unique(product_tmpl_id, related_tmpl_id)',
+         'A product can only be recommended once for another product.')
+    ]
+
+    # Recommendations kept per product (the product page shows 4, the rest
+    # covers products unpublished since the last run)
+    _TOP_N = 8
+
+    # One order bought together weighs as much as this many shared categories
+    _CO_PURCHASE_WEIGHT = 3.0
+    _CATEGORY_WEIGHT = 1.0
+
+    # Products recomputed per transaction
+    _BATCH_SIZE = 500
+
+    # Score every (product, candidate) pair of a batch of products and keep the top N:
+    # co-purchases from confirmed orders, plus the number of shared website categories
+    _COMPUTE_QUERY = """
+        WITH co_purchase AS (
+            SELECT product_a.product_tmpl_id AS tmpl_id,
+                   product_b.product_tmpl_id AS related_id,
+                   COUNT(DISTINCT line_a.order_id) AS orders
+              FROM sale_order_line line_a
+              JOIN sale_order sale ON sale.id = line_a.order_id
+              JOIN sale_order_line line_b ON line_b.order_id = line_a.order_id
+              JOIN product_product product_a ON product_a.id = line_a.product_id
+              JOIN product_product product_b ON product_b.id = line_b.product_id
+             WHERE sale.state IN ('sale', 'done')
+               AND product_a.product_tmpl_id IN %(tmpl_ids)s
+               AND product_b.product_tmpl_id != product_a.product_tmpl_id
+          GROUP BY 1, 2
+        ), category_overlap AS (
+            SELECT rel_a.product_template_id AS tmpl_id,
+                   rel_b.product_template_id AS related_id,
+                   COUNT(*) AS shared
+              FROM product_public_category_product_template_rel rel_a
+              JOIN product_public_category_product_template_rel rel_b
+                ON rel_b.product_public_category_id = rel_a.product_public_category_id
+               AND rel_b.product_template_id != rel_a.product_template_id
+             WHERE rel_a.product_template_id IN %(tmpl_ids)s
+          GROUP BY 1, 2
+        ), ranked AS (
+            SELECT scored.tmpl_id, scored.related_id, scored.score,
+                   ROW_NUMBER() OVER (PARTITION BY scored.tmpl_id
+                                      ORDER BY scored.score DESC, related.website_sequence, related.id DESC) AS rank
+              FROM (
+                    SELECT COALESCE(cp.tmpl_id, co.tmpl_id) AS tmpl_id,
+                           COALESCE(cp.related_id, co.related_id) AS related_id,
+                           COALESCE(cp.orders, 0) * %(co_purchase_weight)s
+                         + COALESCE(co.shared, 0) * %(category_weight)s AS score
+                      FROM co_purchase cp
+           FULL OUTER JOIN category_overlap co
+                        ON co.tmpl_id = cp.tmpl_id AND co.related_id = cp.related_id
+                   ) scored
+              JOIN product_template related ON related.id = scored.related_id
+             WHERE related.is_published AND related.active
+        )
+        INSERT INTO marketplace_product_related
+               (product_tmpl_id, related_tmpl_id, sequence, score, create_uid, create_date, write_uid, write_date)
+        SELECT tmpl_id, related_id, rank, score, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+          FROM ranked
+         WHERE rank <= %(top_n)s
+    """
+
+    def init(self):
+        # The product page reads the first rows of one product, in rank order
+        create_index(self._cr, 'marketplace_product_related_rank_idx', self._table, ['product_tmpl_id', 'sequence'])
+
+    @api.model
+    def _cron_compute_related_products(self):
+        """ Recompute the recommendations of every published product, batch by batch """
+        ProductTemplate = self.env['product.template'].sudo()
+        ProductTemplate.flush_model(['is_published', 'active', 'website_sequence', 'public_categ_ids'])
+        self.env['sale.order.line'].flush_model(['order_id', 'product_id'])
+
+        last_id = 0
+        total = 0
+        while True:
+            # Keyset over product ids: each batch is its own short transaction
+            self.env.cr.execute(SQL(
+                "SELECT id FROM product_template WHERE is_published AND active AND id > %s ORDER BY id LIMIT %s",
+                last_id, self._BATCH_SIZE,
+            ))
+            tmpl_ids = tuple(row[0] for row in self.env.cr.fetchall())
+            if not tmpl_ids:
+                break
+            last_id = tmpl_ids[-1]
+
+            self._compute_related_products(tmpl_ids)
+            total += len(tmpl_ids)
+            self.env.cr.commit()
+
+        # Products unpublished since the last run keep no recommendations
+        self.env.cr.execute("""
+            DELETE FROM marketplace_product_related related
+             USING product_template tmpl
+             WHERE tmpl.id = related.product_tmpl_id
+               AND NOT (tmpl.is_published AND tmpl.active)
+        """)
+        self.invalidate_model()
+        _logger.info("Computed related products for %s products", total)
+        return True
+
+    @api.model
+    def _compute_related_products(self, tmpl_ids):
+        """ Replace the recommendations of the given product templates """
+        self.env.cr.execute(
+            "DELETE FROM marketplace_product_related WHERE product_tmpl_id IN %s", [tuple(tmpl_ids)]
+        )
+        self.env.cr.execute(self._COMPUTE_QUERY, {
+            'tmpl_ids': tuple(tmpl_ids),
+            'co_purchase_weight': self._CO_PURCHASE_WEIGHT,
+            'category_weight': self._CATEGORY_WEIGHT,
+            'top_n': self._TOP_N,
+            'uid': self.env.uid,
+        })
+
+    @api.model
+    def _get_related_products(self, product, limit=4):
+        """ Precomputed recommendations of ``product`` that are still published """
+        related = self.search([('product_tmpl_id', '=', product.id)], limit=self._TOP_N).related_tmpl_id
+        return related.filtered(lambda p: p.is_published and p.active)[:limit]
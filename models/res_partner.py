@@ -14,4 +14,11 @@ class ResPartner(models.Model):
         string="Profil Vendeur",
         readonly=True,
         help="Lien vers le profil vendeur associé."
-    )
\ No newline at end of file
+    )
+
+    def write(self, vals):
+        res = super(ResPartner, self).write(vals)
+        if 'city' in vals:
+            # The city is part of the shops' /makers search document
+            self.env['marketplace.vendor'].sudo().search([('partner_id', 'in', self.ids)])._refresh_search_document()
+        return res
@@ -11,6 +11,15 @@ class SaleOrder(models.Model):
         for order in self:
             order.is_marketplace_order = any(order.order_line.mapped('vendor_id'))
 
+    def write(self, vals):
+        # Moving a confirmed order to another day moves its sales in the daily rollup
+        keys = self.order_line._get_sales_daily_keys() if 'date_order' in vals else set()
+        res = super(SaleOrder, self).write(vals)
+        if keys:
+            keys |= self.order_line._get_sales_daily_keys()
+            self.env['marketplace.vendor.sales.daily']._schedule_refresh(keys)
+        return res
+
     def action_confirm(self):
         """ Surcharge de la confirmation pour générer les commissions """
         res = super(SaleOrder, self).action_confirm()
@@ -154,5 +163,26 @@ class SaleOrderLine(models.Model):
         related='product_id.product_tmpl_id.vendor_id', 
         string="Vendeur", 
         store=True,
-        readonly=True
-    )
\ No newline at end of file
+        readonly=True,
+        index=True,  # vendor order list, dashboard and marketplace.vendor.order filter on it
+    )
+
+    # Fields changing the amounts or units a line adds to marketplace.vendor.sales.daily
+    _SALES_DAILY_FIELDS = {'price_unit', 'product_uom_qty', 'discount', 'tax_id', 'price_subtotal', 'product_id', 'vendor_id'}
+
+    def write(self, vals):
+        touched = self._SALES_DAILY_FIELDS.intersection(vals)
+        keys = self._get_sales_daily_keys() if touched else set()
+        res = super(SaleOrderLine, self).write(vals)
+        if keys:
+            # The commission amounts are recomputed by then: the refresh runs at precommit
+            self.env['marketplace.vendor.sales.daily']._schedule_refresh(keys)
+        return res
+
+    def _get_sales_daily_keys(self):
+        """ (vendor_id, order day) rows of the daily sales rollup the commissions of these lines count in """
+        lines = self.filtered('vendor_id')
+        if not lines:
+            return set()
+        commissions = self.env['marketplace.commission'].sudo().search([('order_line_id', 'in', lines.ids)])
+        return commissions._get_sales_daily_keys()
\ No newline at end of file
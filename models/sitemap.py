@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from xml.sax.saxutils import escape
+
+from odoo import models, api
+from odoo.tools.sql import SQL
+from odoo.addons.http_routing.models.ir_http import slug
+
+
+class MarketplaceSitemap(models.AbstractModel):
+    _name = 'marketplace.sitemap'
+    _description = 'Storefront Sitemap'
+
+    # URLs per sitemap file (the protocol allows 50,000 / 50 MB)
+    _CHUNK_SIZE = 5000
+
+    # Rows read from the cursor at a time while writing a file
+    _FETCH_SIZE = 1000
+
+    # kind -> (invalidation tag, URL prefix, rows query: id, name, lastmod)
+    _KINDS = {
+        'products': ('catalog', '/product/', """
+            SELECT id, COALESCE(name->>'en_US', ''), write_date
+              FROM product_template
+             WHERE is_published AND active"""),
+        'vendors': ('catalog', '/vendor/', """
+            SELECT id, shop_name, write_date
+              FROM marketplace_vendor
+             WHERE state = 'active'"""),
+        'categories': ('catalog', '/category/', """
+            SELECT id, COALESCE(name->>'en_US', ''), write_date
+              FROM product_public_category
+             WHERE published_product_count > 0"""),
+        'blog': ('blog', '/blog/post/', """
+            SELECT id, NULL, write_date
+              FROM blog_post
+             WHERE is_published"""),
+    }
+
+    @api.model
+    def _get_cache_key(self, *parts):
+        """ Key on the generation of the tags involved: a change drops the documents """
+        tags = {tag for tag, _prefix, _query in self._KINDS.values()}
+        return (self.env['marketplace.page.cache']._get_generations(tags),) + parts
+
+    @api.model
+    def _get_chunk_starts(self, kind):
+        """ First id of every file of ``kind``: files are id ranges walked by keyset """
+        _tag, _prefix, query = self._KINDS[kind]
+        self.env.cr.execute(SQL("""
+            SELECT id FROM (
+                SELECT rows.id, ROW_NUMBER() OVER (ORDER BY rows.id) AS position
+                  FROM (%s) rows
+            ) numbered
+             WHERE position %% %s = 1
+          ORDER BY id
+        """, SQL(query), self._CHUNK_SIZE))
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _get_chunks(self):
+        """ {kind: [first id of each file]} of the current generation """
+        Cache = self.env['marketplace.listing.cache']
+        self._flush_sources()
+        return Cache._get_or_compute('sitemap', self._get_cache_key('chunks'), lambda: {
+            kind: self._get_chunk_starts(kind) for kind in self._KINDS
+        })
+
+    @api.model
+    def _render_index(self, base_url):
+        chunks = self._get_chunks()
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+                 '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+        for kind in self._KINDS:
+            for number in range(1, len(chunks[kind]) + 1):
+                parts.append('<sitemap><loc>%s/marketplace/sitemap/%s/%s.xml</loc></sitemap>\n' % (
+                    escape(base_url), kind, number
+                ))
+        parts.append('</sitemapindex>\n')
+        return ''.join(parts).encode()
+
+    @api.model
+    def _render_chunk(self, base_url, kind, number):
+        """ One sitemap file, or None if it does not exist """
+        starts = self._get_chunks().get(kind)
+        if not starts or not 1 <= number <= len(starts):
+            return None
+        _tag, prefix, query = self._KINDS[kind]
+
+        self.env.cr.execute(SQL(
+            "SELECT * FROM (%s) rows WHERE rows.id >= %s ORDER BY rows.id LIMIT %s",
+            SQL(query), starts[number - 1], self._CHUNK_SIZE,
+        ))
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+                 '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+        # Written while reading the rows, a batch at a time
+        while True:
+            rows = self.env.cr.fetchmany(self._FETCH_SIZE)
+            if not rows:
+                break
+            for record_id, name, write_date in rows:
+                path = prefix + (slug((record_id, name)) if name else str(record_id))
+                parts.append('<url><loc>%s%s</loc>%s</url>\n' % (
+                    escape(base_url), escape(path),
+                    '<lastmod>%s</lastmod>' % write_date.date().isoformat() if write_date else '',
+                ))
+        parts.append('</urlset>\n')
+        return ''.join(parts).encode()
+
+    @api.model
+    def _get_document(self, base_url, kind=None, number=None):
+        """ Cached sitemap index (no ``kind``) or file, as bytes """
+        Cache = self.env['marketplace.listing.cache']
+        key = self._get_cache_key(base_url, kind, number)
+        if kind is None:
+            return Cache._get_or_compute('sitemap', key, lambda: self._render_index(base_url))
+        return Cache._get_or_compute('sitemap', key, lambda: self._render_chunk(base_url, kind, number))
+
+    @api.model
+    def _flush_sources(self):
+        self.env['product.template'].flush_model(['name', 'is_published', 'active'])
+        self.env['marketplace.vendor'].flush_model(['shop_name', 'state'])
+        self.env['product.public.category'].flush_model(['name', 'published_product_count'])
+        self.env['blog.post'].flush_model(['is_published'])
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import math
+
+from odoo import models, api, _
+
+
+class StockQuant(models.Model):
+    _inherit = 'stock.quant'
+
+    @api.model
+    def _marketplace_set_quantities(self, location_id, quantities):
+        """ Set the on-hand quantity of many variants in one location, directly
+        (no inventory adjustment), like the vendor portal does for one product.
+
+        ``quantities`` is ``{product_id: quantity}``. Existing quants are read
+        in one search and only written when the quantity differs, the missing
+        ones are created together: applying the same quantities twice is a no-op.
+        Returns the number of quants written or created.
+        """
+        if not quantities:
+            return 0
+        Quant = self.sudo()
+        quants = Quant.search([
+            ('product_id', 'in', list(quantities)),
+            ('location_id', '=', location_id),
+            ('lot_id', '=', False),
+            ('package_id', '=', False),
+            ('owner_id', '=', False),
+        ])
+        changed = 0
+        missing = dict(quantities)
+        for quant in quants:
+            quantity = missing.pop(quant.product_id.id, None)
+            if quantity is None:
+                # Another quant of the same product already got the quantity
+                continue
+            if quant.quantity != quantity:
+                quant.write({'quantity': quantity})
+                changed += 1
+        # No quant means nothing on hand: zero needs no record
+        missing = {product_id: quantity for product_id, quantity in missing.items() if quantity}
+        Quant.create([{
+            'product_id': product_id,
+            'location_id': location_id,
+            'quantity': quantity,
+        } for product_id, quantity in missing.items()])
+        return changed + len(missing)
+
+    @api.model
+    def _marketplace_sync_vendor_stock(self, vendor, items, location_id):
+        """ Apply the stock levels a vendor sends from its own system.
+
+        ``items`` is a list of ``{'sku' or 'product_id', 'quantity'}``, quantities
+        are absolute (not deltas) so a retried call changes nothing. Products are
+        resolved in one read, limited to the vendor's own products.
+        Returns ``{'updated', 'unchanged', 'errors': [{'index', 'error'}]}``.
+        """
+        errors = []
+        wanted = []
+        skus, tmpl_ids = set(), set()
+        for index, item in enumerate(items):
+            try:
+                quantity = float(item['quantity'])
+            except (KeyError, TypeError, ValueError):
+                quantity = None
+            # float() also reads "nan" and "inf"
+            if quantity is None or not math.isfinite(quantity):
+                errors.append({'index': index, 'error': _("A numeric quantity is required")})
+                continue
+            if quantity < 0:
+                errors.append({'index': index, 'error': _("The quantity cannot be negative")})
+                continue
+            sku, tmpl_id = item.get('sku'), item.get('product_id')
+            if isinstance(tmpl_id, str) and tmpl_id.isdigit():
+                tmpl_id = int(tmpl_id)
+            if sku:
+                skus.add(str(sku))
+            elif isinstance(tmpl_id, int) and not isinstance(tmpl_id, bool):
+                tmpl_ids.add(tmpl_id)
+            else:
+                errors.append({'index': index, 'error': _("A sku or a product_id is required")})
+                continue
+            wanted.append((index, str(sku) if sku else tmpl_id, quantity))
+
+        domain = [('vendor_id', '=', vendor.id)]
+        if skus and tmpl_ids:
+            domain += ['|', ('default_code', 'in', list(skus)), ('id', 'in', list(tmpl_ids))]
+        elif skus:
+            domain += [('default_code', 'in', list(skus))]
+        else:
+            domain += [('id', 'in', list(tmpl_ids))]
+        variants = {}
+        if wanted:
+            for product in self.env['product.template'].sudo().search_read(domain, ['default_code', 'product_variant_id']):
+                if not product['product_variant_id']:
+                    continue
+                variants[product['id']] = product['product_variant_id'][0]
+                if product['default_code']:
+                    variants[product['default_code']] = product['product_variant_id'][0]
+
+        # Later lines of the same product win, like applying them in order
+        quantities = {}
+        for index, key, quantity in wanted:
+            product_id = variants.get(key)
+            if not product_id:
+                errors.append({'index': index, 'error': _("Product %s not found among your products", key)})
+                continue
+            quantities[product_id] = quantity
+
+        updated = self._marketplace_set_quantities(location_id, quantities)
+        return {
+            'updated': updated,
+            'unchanged': len(quantities) - updated,
+            'errors': errors,
+        }
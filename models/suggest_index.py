@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from odoo import models, api
+from odoo.tools.sql import SQL
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """ Lowercase, accent-free form used for both indexing and lookups """
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+class PrefixIndex(object):
+    """ Sorted distinct words of the labels, each with the positions (in priority
+    order) of the labels containing it: the words starting with a prefix are a
+    contiguous slice found by bisection, every word of a label is indexed so
+    'mug' finds 'Blue Ceramic Mug'.
+    """
+
+    def __init__(self, entries):
+        # entries: [(id, label)] in display priority order
+        self.entries = entries
+        self.normalized = [normalize(label) for _id, label in entries]
+        positions = defaultdict(list)
+        for position, text in enumerate(self.normalized):
+            for word in set(_WORD_RE.findall(text)):
+                positions[word].append(position)
+        self.keys = sorted(positions)
+        # Ascending positions per word, i.e. best label first
+        self.positions = [positions[word] for word in self.keys]
+
+    def search(self, terms, limit):
+        """ Entries whose words start with every term (the last one typed partially) """
+        prefix = max(terms, key=len)
+        others = list(terms)
+        others.remove(prefix)
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_right(self.keys, prefix + '\uffff', start)
+
+        # Every word of the prefix range, merged in priority order: the scan
+        # stops as soon as enough labels match the other terms
+        matches = []
+        previous = None
+        for position in heapq.merge(*self.positions[start:end]):
+            if position == previous:
+                continue
+            previous = position
+            words = _WORD_RE.findall(self.normalized[position])
+            if all(any(word.startswith(term) for word in words) for term in others):
+                matches.append(position)
+                if len(matches) == limit:
+                    break
+        return [self.entries[position] for position in matches]
+
+
+# (dbname, lang) -> (catalog generation, {kind: PrefixIndex}), one per worker
+_suggest_indexes = {}
+_suggest_lock = threading.Lock()
+
+
+class MarketplaceSuggest(models.AbstractModel):
+    _name = 'marketplace.suggest'
+    _description = 'Storefront Search Suggestions'
+
+    # Shortest prefix answered: one letter would match most of the catalog
+    _MIN_TERM_LENGTH = 2
+
+    @api.model
+    def _get_indexes(self):
+        """ Prefix indexes of the current catalog generation, rebuilt after a change """
+        generation = self.env['marketplace.listing.cache']._get_generation()
+        key = (self.env.cr.dbname, self.env.lang or 'en_US')
+        cached = _suggest_indexes.get(key)
+        if cached and cached[0] == generation:
+            return cached[1]
+
+        with _suggest_lock:
+            cached = _suggest_indexes.get(key)
+            if cached and cached[0] == generation:
+                return cached[1]
+            indexes = self._build_indexes()
+            _suggest_indexes[key] = (generation, indexes)
+            return indexes
+
+    @api.model
+    def _build_indexes(self):
+        """ Load the names of everything the storefront can link to, best first """
+        lang = self.env.lang or 'en_US'
+        self.env['product.template'].flush_model(['name', 'is_published', 'active', 'website_sequence'])
+        self.env['marketplace.vendor'].flush_model(['shop_name', 'state', 'sale_count'])
+        self.env['product.public.category'].flush_model(['name', 'published_product_count'])
+
+        cr = self.env.cr
+        cr.execute(SQL("""
+            SELECT id, COALESCE(name->>%s, name->>'en_US')
+              FROM product_template
+             WHERE is_published AND active
+          ORDER BY website_sequence, create_date DESC, id DESC
+        """, lang))
+        products = cr.fetchall()
+        cr.execute("""
+            SELECT id, shop_name
+              FROM marketplace_vendor
+             WHERE state = 'active'
+          ORDER BY sale_count DESC NULLS LAST, id
+        """)
+        vendors = cr.fetchall()
+        cr.execute(SQL("""
+            SELECT id, COALESCE(name->>%s, name->>'en_US')
+              FROM product_public_category
+             WHERE published_product_count > 0
+          ORDER BY published_product_count DESC, id
+        """, lang))
+        categories = cr.fetchall()
+
+        return {
+            'products': PrefixIndex(products),
+            'vendors': PrefixIndex(vendors),
+            'categories': PrefixIndex(categories),
+        }
+
+    @api.model
+    def _suggest(self, term, limit=5):
+        """ Products, vendors and categories whose names match ``term`` as you type """
+        terms = _WORD_RE.findall(normalize(term))
+        result = {'products': [], 'vendors': [], 'categories': []}
+        if not terms or len(max(terms, key=len)) < self._MIN_TERM_LENGTH:
+            return result
+
+        indexes = self._get_indexes()
+        result['products'] = [
+            {'id': id_, 'name': name, 'url': '/product/%s' % id_}
+            for id_, name in indexes['products'].search(terms, limit)
+        ]
+        result['vendors'] = [
+            {'id': id_, 'name': name, 'url': '/vendor/%s' % id_}
+            for id_, name in indexes['vendors'].search(terms, limit)
+        ]
+        result['categories'] = [
+            {'id': id_, 'name': name, 'url': '/category/%s' % id_}
+            for id_, name in indexes['categories'].search(terms, limit)
+        ]
+        return result
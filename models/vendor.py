@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api, _
+import base64
+import json
+
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import SQL, column_exists, create_column, create_index
 
 class MarketplaceVendor(models.Model):
     _name = 'marketplace.vendor'
@@ -54,6 +58,23 @@ class MarketplaceVendor(models.Model):
         ('shop_url_uniq', 'unique(shop_url)', 'This Shop URL is already taken.')
     ]
 
+    # Fields indexed in the /makers full-text search document
+    _SEARCH_DOCUMENT_FIELDS = {'shop_name', 'description', 'partner_id'}
+
+    # Full-text document of the makers directory: shop name first, then city, then description
+    _SEARCH_DOCUMENT_QUERY = """
+        UPDATE marketplace_vendor vendor
+           SET marketplace_search_tsv =
+                   setweight(to_tsvector('simple', COALESCE(vendor.shop_name, '')), 'A')
+                || setweight(to_tsvector('simple', COALESCE(
+                       (SELECT partner.city FROM res_partner partner WHERE partner.id = vendor.partner_id), '')), 'B')
+                || setweight(to_tsvector('simple', COALESCE(vendor.description, '')), 'C')
+    """
+
+    # Weight of ln(1 + sale_count) next to the text rank (normalized to [0, 1)):
+    # relevance decides, sales break near-ties
+    _SEARCH_SALES_WEIGHT = 0.05
+
     @api.depends('commission_ids', 'commission_ids.state', 'commission_ids.amount_vendor')
     def _compute_balance(self):
         """Calculate available balance from confirmed commissions minus paid ones"""
@@ -73,6 +94,48 @@ class MarketplaceVendor(models.Model):
             rec.sale_count = len(confirmed_comms)
             rec.total_commission = sum(confirmed_comms.mapped('amount_commission'))
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        vendors = super(MarketplaceVendor, self).create(vals_list)
+        vendors._refresh_search_document()
+        # The partner now has a vendor profile (see _get_vendor_id_for_partner)
+        self.env.registry.clear_cache()
+        return vendors
+
+    def write(self, vals):
+        res = super(MarketplaceVendor, self).write(vals)
+        if self._SEARCH_DOCUMENT_FIELDS.intersection(vals):
+            self._refresh_search_document()
+        if 'shop_name' in vals:
+            # The shop name is part of the products' full-text search document
+            self.sudo().with_context(active_test=False).product_ids._refresh_search_document()
+        if 'shop_name' in vals or 'state' in vals:
+            # Listings, facets and search suggestions show the active shops' names
+            self.env['marketplace.listing.cache']._invalidate()
+        if 'partner_id' in vals or 'state' in vals:
+            # Approval / rejection: portal requests resolve the vendor anew
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super(MarketplaceVendor, self).unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache('partner_id')
+    def _get_vendor_id_for_partner(self, partner_id):
+        """ Id of the vendor profile of a partner (False if none), cached per worker.
+        Cleared when a vendor is created, deleted, approved or rejected.
+        """
+        vendor = self.sudo().search([('partner_id', '=', partner_id)], limit=1)
+        return vendor.id or False
+
+    @api.model
+    def _get_current_vendor(self):
+        """ Vendor profile of the current user (empty recordset if none) """
+        return self.browse(self._get_vendor_id_for_partner(self.env.user.partner_id.id))
+
     def action_approve(self):
         """ 
         1. Set state to Active 
@@ -94,4 +157,173 @@ class MarketplaceVendor(models.Model):
 
     def action_reject(self):
         for record in self:
-            record.state = 'rejected'
\ No newline at end of file
+            record.state = 'rejected'
+
+    def _auto_init(self):
+        res = super(MarketplaceVendor, self)._auto_init()
+        # tsvector is not an ORM field type: the column is managed here and in _refresh_search_document
+        if not column_exists(self._cr, self._table, 'marketplace_search_tsv'):
+            create_column(self._cr, self._table, 'marketplace_search_tsv', 'tsvector')
+        create_index(self._cr, 'marketplace_vendor_search_tsv_idx', self._table, ['marketplace_search_tsv'], method='gin')
+        # Unfiltered directory order (most sales first), walked by keyset
+        create_index(self._cr, 'marketplace_vendor_makers_idx', self._table,
+                     ['sale_count DESC', 'id DESC'], where="state = 'active'")
+        return res
+
+    def init(self):
+        # Fill the search document of existing shops on install / upgrade
+        self.env.cr.execute(self._SEARCH_DOCUMENT_QUERY + " WHERE vendor.marketplace_search_tsv IS NULL")
+
+    def _refresh_search_document(self):
+        """ Rebuild the full-text document of these shops """
+        if not self.ids:
+            return
+        self.flush_recordset(['shop_name', 'description', 'partner_id'])
+        self.env['res.partner'].flush_model(['city'])
+        self.env.cr.execute(self._SEARCH_DOCUMENT_QUERY + " WHERE vendor.id IN %s", [tuple(self.ids)])
+
+    # ------------------------------------------------------------
+    # MAKERS DIRECTORY (ranked search, keyset pagination)
+    # ------------------------------------------------------------
+
+    @api.model
+    def _encode_makers_cursor(self, tsquery, score, vendor_id):
+        payload = json.dumps([tsquery, score, vendor_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @api.model
+    def _decode_makers_cursor(self, cursor, tsquery):
+        """ (score, id) stored in a cursor, or None if invalid or made for another search """
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            cursor_query, score, vendor_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            return None
+        if cursor_query != tsquery or not isinstance(score, (int, float)) or not isinstance(vendor_id, int):
+            return None
+        return score, vendor_id
+
+    @api.model
+    def _search_makers_page(self, search=None, limit=12, after=None, before=None):
+        """ One page of active shops and the cursors of its neighbours.
+
+        With ``search``, shops matching the full-text document are ranked by
+        text relevance blended with their sales, otherwise by sales. Returns
+        ``(vendors, next_cursor, prev_cursor)`` like product.template._search_listing_page.
+        """
+        tsquery = self.env['product.template']._get_search_tsquery(search) if search else ''
+        values = self._decode_makers_cursor(before or after, tsquery)
+        backward = bool(before) and values is not None
+
+        self.flush_model(['state', 'sale_count', 'shop_name', 'description'])
+        if tsquery:
+            score = SQL(
+                "ts_rank_cd(vendor.marketplace_search_tsv, to_tsquery('simple', %s), 32) + %s * ln(1 + vendor.sale_count)",
+                tsquery, self._SEARCH_SALES_WEIGHT,
+            )
+            match = SQL("AND vendor.marketplace_search_tsv @@ to_tsquery('simple', %s)", tsquery)
+        else:
+            score, match = SQL("vendor.sale_count"), SQL()
+
+        # Both keys descend, so "after (score, id)" is a row comparison the index can use
+        keyset = SQL()
+        if values:
+            keyset = SQL("WHERE (ranked.score, ranked.id) %s (%s, %s)", SQL('>' if backward else '<'), *values)
+        direction = SQL('ASC' if backward else 'DESC')
+        self.env.cr.execute(SQL("""
+            SELECT ranked.id, ranked.score
+              FROM (
+                    SELECT vendor.id, %s AS score
+                      FROM marketplace_vendor vendor
+                     WHERE vendor.state = 'active' %s
+                   ) ranked
+            %s
+          ORDER BY ranked.score %s, ranked.id %s
+             LIMIT %s
+        """, score, match, keyset, direction, direction, limit + 1))
+        rows = self.env.cr.fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backward:
+            rows.reverse()
+        if not rows:
+            return self.browse(), False, False
+
+        if backward:
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, bool(values)
+        (first_id, first_score), (last_id, last_score) = rows[0], rows[-1]
+        next_cursor = self._encode_makers_cursor(tsquery, last_score, last_id) if has_next else False
+        prev_cursor = self._encode_makers_cursor(tsquery, first_score, first_id) if has_prev else False
+        return self.browse([row[0] for row in rows]), next_cursor, prev_cursor
+
+    # ------------------------------------------------------------
+    # VENDOR DASHBOARD (aggregated in SQL)
+    # ------------------------------------------------------------
+
+    # Confirmed order lines of one shop, the base of every dashboard figure
+    _DASHBOARD_LINES = """
+        SELECT line.order_id, line.price_subtotal, sale.date_order
+          FROM sale_order_line line
+          JOIN sale_order sale ON sale.id = line.order_id
+         WHERE sale.state IN ('sale', 'done')
+           AND line.vendor_id = %s
+    """
+
+    def _get_dashboard_metrics(self, days=7, recent_limit=5):
+        """ Dashboard figures of this shop in a fixed number of queries, whatever its history.
+
+        Returns ``{'sales', 'orders', 'products', 'recent_orders', 'chart': [(date, total)]}``,
+        the chart covering the last ``days`` days up to today (empty days at 0).
+        """
+        self.ensure_one()
+        self.env['sale.order'].flush_model(['state', 'date_order'])
+        self.env['sale.order.line'].flush_model(['order_id', 'vendor_id', 'price_subtotal'])
+        lines = SQL(self._DASHBOARD_LINES, self.id)
+        cr = self.env.cr
+
+        cr.execute(SQL("""
+            SELECT COALESCE(SUM(lines.price_subtotal), 0)::float, COUNT(DISTINCT lines.order_id)
+              FROM (%s) lines
+        """, lines))
+        sales, orders = cr.fetchone()
+
+        today = fields.Date.today()
+        first_day = fields.Date.subtract(today, days=days - 1)
+        cr.execute(SQL("""
+            SELECT lines.date_order::date AS day, SUM(lines.price_subtotal)::float
+              FROM (%s) lines
+             WHERE lines.date_order >= %s
+          GROUP BY day
+        """, lines, first_day))
+        totals = dict(cr.fetchall())
+        chart = [
+            (day, totals.get(day, 0.0))
+            for day in (fields.Date.add(first_day, days=offset) for offset in range(days))
+        ]
+
+        # Latest distinct orders containing one of the shop's products
+        cr.execute(SQL("""
+            SELECT sale.id
+              FROM sale_order sale
+             WHERE sale.id IN (SELECT lines.order_id FROM (%s) lines)
+          ORDER BY sale.date_order DESC, sale.id DESC
+             LIMIT %s
+        """, lines, recent_limit))
+        recent_orders = self.env['sale.order'].sudo().browse([row[0] for row in cr.fetchall()])
+
+        products = self.env['product.template'].search_count([
+            ('vendor_id', '=', self.id),
+            ('is_published', '=', True),
+        ])
+        return {
+            'sales': sales,
+            'orders': orders,
+            'products': products,
+            'recent_orders': recent_orders,
+            'chart': chart,
+        }
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import tempfile
+
+from odoo import models, api
+from odoo.tools.sql import SQL
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+class MarketplaceVendorExport(models.AbstractModel):
+    _name = 'marketplace.vendor.export'
+    _description = 'Export vendeur (commandes, commissions)'
+
+    # Rows fetched per query: exports walk the history by keyset, so memory
+    # stays the same whatever the size of the export
+    _CHUNK_SIZE = 2000
+
+    _HEADERS = {
+        'orders': ['Order', 'Date', 'Customer', 'Status', 'Products', 'Items', 'Vendor Total', 'Currency'],
+        'commissions': ['Reference', 'Order', 'Date', 'Sale Amount', 'Commission', 'Your Earning', 'Status', 'Currency'],
+    }
+
+    _STATES = {
+        'orders': ('draft', 'sent', 'sale', 'cancel'),
+        'commissions': ('draft', 'confirmed', 'paid', 'cancel'),
+    }
+
+    @api.model
+    def _get_formats(self):
+        """ File formats available on this server (XLSX needs xlsxwriter) """
+        return ('csv', 'xlsx') if xlsxwriter else ('csv',)
+
+    @api.model
+    def _get_chunk_query(self, kind, vendor_id, date_from=None, date_to=None, state=None, after=None):
+        """ Next chunk of ``kind`` rows of a vendor, newest first, after the keyset ``after``.
+        The last two columns of each row are the keyset (date, id) and are not exported.
+        Rows without a date are exported too, after the dated ones.
+        """
+        conditions = []
+        if kind == 'orders':
+            table, date_column = SQL("(%s)", SQL(self.env['marketplace.vendor.order']._table_query)), SQL("summary.date_order")
+            columns = SQL("""
+                summary.name, summary.date_order, partner.name, summary.state, summary.product_names,
+                summary.item_count, summary.vendor_total, currency.name
+            """)
+            joins = SQL("""
+                LEFT JOIN res_partner partner ON partner.id = summary.partner_id
+                LEFT JOIN res_currency currency ON currency.id = summary.currency_id
+            """)
+            conditions.append(SQL("summary.vendor_id = %s", vendor_id))
+        else:
+            table, date_column = SQL("marketplace_commission"), SQL("summary.create_date")
+            columns = SQL("""
+                summary.name, sale.name, summary.create_date, summary.sale_amount, summary.amount_commission,
+                summary.amount_vendor, summary.state, currency.name
+            """)
+            joins = SQL("""
+                LEFT JOIN sale_order_line line ON line.id = summary.order_line_id
+                LEFT JOIN sale_order sale ON sale.id = line.order_id
+                LEFT JOIN res_currency currency ON currency.id = line.currency_id
+            """)
+            conditions.append(SQL("summary.vendor_id = %s", vendor_id))
+
+        if date_from:
+            conditions.append(SQL("%s >= %s", date_column, date_from))
+        if date_to:
+            conditions.append(SQL("%s < %s::date + 1", date_column, date_to))
+        if state:
+            conditions.append(SQL("summary.state = %s", state))
+        if after:
+            # Rows without a date come last (NULLS LAST) and are walked by id only
+            last_date, last_id = after
+            if last_date is None:
+                conditions.append(SQL("%s IS NULL AND summary.id < %s", date_column, last_id))
+            else:
+                conditions.append(SQL(
+                    "((%s, summary.id) < (%s, %s) OR %s IS NULL)", date_column, last_date, last_id, date_column,
+                ))
+
+        return SQL("""
+            SELECT %s, %s, summary.id
+              FROM %s summary
+            %s
+             WHERE %s
+          ORDER BY %s DESC NULLS LAST, summary.id DESC
+             LIMIT %s
+        """, columns, date_column, table, joins, SQL(" AND ").join(conditions), date_column, self._CHUNK_SIZE)
+
+    @api.model
+    def _iter_chunks(self, kind, vendor_id, date_from=None, date_to=None, state=None):
+        """ Yield the export rows chunk by chunk (lists of tuples, keyset columns removed) """
+        after = None
+        while True:
+            self.env.cr.execute(self._get_chunk_query(kind, vendor_id, date_from, date_to, state, after))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                return
+            after = rows[-1][-2:]
+            yield [row[:-2] for row in rows]
+            if len(rows) < self._CHUNK_SIZE:
+                return
+
+    @api.model
+    def _format_value(self, value):
+        if value is None:
+            return ''
+        if hasattr(value, 'isoformat'):
+            return value.isoformat(sep=' ') if hasattr(value, 'hour') else value.isoformat()
+        return value
+
+    @api.model
+    def _stream_csv(self, kind, vendor_id, **filters):
+        """ Yield the CSV file as encoded blocks, one per chunk of rows """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # BOM: spreadsheet applications then read the file as UTF-8
+        buffer.write('\ufeff')
+        writer.writerow(self._HEADERS[kind])
+        for rows in self._iter_chunks(kind, vendor_id, **filters):
+            writer.writerows([self._format_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    @api.model
+    def _stream_xlsx(self, kind, vendor_id, **filters):
+        """ Yield the XLSX file in blocks. The workbook is written row by row to a
+        temporary file (constant_memory), which is then sent and deleted: unlike
+        CSV, nothing is sent before the whole workbook is written.
+        """
+        with tempfile.TemporaryFile() as output:
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+            sheet = workbook.add_worksheet(kind.capitalize())
+            bold = workbook.add_format({'bold': True})
+            sheet.write_row(0, 0, self._HEADERS[kind], bold)
+            row_number = 1
+            for rows in self._iter_chunks(kind, vendor_id, **filters):
+                for row in rows:
+                    sheet.write_row(row_number, 0, [self._format_value(value) for value in row])
+                    row_number += 1
+            workbook.close()
+
+            output.seek(0)
+            while True:
+                block = output.read(64 * 1024)
+                if not block:
+                    break
+                yield block
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields
+from odoo.addons.sale.models.sale_order import SALE_ORDER_STATE
+
+
+class MarketplaceVendorOrder(models.Model):
+    """ One row per (order, vendor): the vendor's share of an order, grouped in SQL """
+    _name = 'marketplace.vendor.order'
+    _description = 'Commande par vendeur'
+    _auto = False
+    _order = 'date_order desc, id desc'
+
+    order_id = fields.Many2one('sale.order', string="Commande", readonly=True)
+    vendor_id = fields.Many2one('marketplace.vendor', string="Vendeur", readonly=True)
+    name = fields.Char(string="Référence", readonly=True)
+    partner_id = fields.Many2one('res.partner', string="Client", readonly=True)
+    date_order = fields.Datetime(string="Date de commande", readonly=True)
+    state = fields.Selection(SALE_ORDER_STATE, string="Statut", readonly=True)
+    currency_id = fields.Many2one('res.currency', string="Devise", readonly=True)
+    vendor_total = fields.Monetary(string="Total Vendeur", readonly=True)
+    item_count = fields.Float(string="Articles", readonly=True)
+    product_names = fields.Char(string="Produits", readonly=True)
+
+    @property
+    def _table_query(self):
+        # The first line id is unique per (order, vendor) and serves as the record id.
+        # Product names are read in the user's language.
+        return self.env.cr.mogrify("""
+            SELECT MIN(line.id) AS id,
+                   line.order_id,
+                   line.vendor_id,
+                   sale.name,
+                   sale.partner_id,
+                   sale.date_order,
+                   sale.state,
+                   sale.currency_id,
+                   SUM(line.price_subtotal) AS vendor_total,
+                   SUM(line.product_uom_qty) AS item_count,
+                   string_agg(COALESCE(tmpl.name->>%s, tmpl.name->>'en_US'), ', '
+                              ORDER BY line.sequence, line.id) AS product_names
+              FROM sale_order_line line
+              JOIN sale_order sale ON sale.id = line.order_id
+              JOIN product_product product ON product.id = line.product_id
+              JOIN product_template tmpl ON tmpl.id = product.product_tmpl_id
+             WHERE line.vendor_id IS NOT NULL
+          GROUP BY line.order_id, line.vendor_id, sale.id
+        """, [self.env.lang or 'en_US']).decode()
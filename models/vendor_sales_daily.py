@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import models, fields, api
+from odoo.tools.sql import SQL
+
+_logger = logging.getLogger(__name__)
+
+
+class MarketplaceVendorSalesDaily(models.Model):
+    _name = 'marketplace.vendor.sales.daily'
+    _description = 'Ventes vendeur par jour'
+    _order = 'vendor_id, date desc'
+
+    vendor_id = fields.Many2one('marketplace.vendor', string="Vendeur", required=True, readonly=True, ondelete='cascade')
+    date = fields.Date(string="Jour", required=True, readonly=True)
+    currency_id = fields.Many2one('res.currency', related='vendor_id.currency_id')
+    gross = fields.Monetary(string="Ventes", readonly=True)
+    commission = fields.Monetary(string="Commission Plateforme", readonly=True)
+    net = fields.Monetary(string="Montant Net Vendeur", readonly=True)
+    order_count = fields.Integer(string="Commandes", readonly=True)
+    unit_count = fields.Float(string="Unités vendues", readonly=True)
+
+    _sql_constraints = [
+        ('unique_vendor_day', 'unique(vendor_id, date)', 'Only one sales summary per vendor and day.')
+    ]
+
+    # Granularities of the analytics endpoint (read_group date grouping)
+    _GRANULARITIES = ('day', 'week', 'month')
+
+    # Days rebuilt per transaction by _rebuild_all
+    _REBUILD_DAYS = 31
+
+    # Commissions counted in the sales, grouped by shop and order day (UTC).
+    # Parameters: uid, uid, condition restricting the rebuilt rows.
+    _ROLLUP_QUERY = """
+        INSERT INTO marketplace_vendor_sales_daily
+               (vendor_id, date, gross, commission, net, order_count, unit_count,
+                create_uid, create_date, write_uid, write_date)
+        SELECT comm.vendor_id, sale.date_order::date,
+               SUM(comm.sale_amount), SUM(comm.amount_commission), SUM(comm.amount_vendor),
+               COUNT(DISTINCT line.order_id), SUM(line.product_uom_qty),
+               %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+          FROM marketplace_commission comm
+          JOIN sale_order_line line ON line.id = comm.order_line_id
+          JOIN sale_order sale ON sale.id = line.order_id
+         WHERE comm.state IN ('confirmed', 'paid')
+           AND %s
+      GROUP BY comm.vendor_id, sale.date_order::date
+    """
+
+    def _flush_sources(self):
+        self.env['marketplace.commission'].flush_model(
+            ['vendor_id', 'order_line_id', 'state', 'sale_amount', 'amount_commission', 'amount_vendor']
+        )
+        self.env['sale.order.line'].flush_model(['order_id', 'product_uom_qty'])
+        self.env['sale.order'].flush_model(['date_order'])
+
+    @api.model
+    def _refresh_days(self, keys):
+        """ Recompute the rows of the given ``(vendor_id, date)`` pairs from the commissions """
+        keys = sorted(keys)
+        if not keys:
+            return
+        self._flush_sources()
+        vendor_ids = [vendor_id for vendor_id, _day in keys]
+        days = [day for _vendor_id, day in keys]
+        pairs = SQL("SELECT * FROM unnest(%s::int[], %s::date[])", vendor_ids, days)
+
+        self.env.cr.execute(SQL(
+            "DELETE FROM marketplace_vendor_sales_daily WHERE (vendor_id, date) IN (%s)", pairs
+        ))
+        # The date_order range lets the index on sale_order.date_order narrow the scan
+        self.env.cr.execute(SQL(
+            self._ROLLUP_QUERY, self.env.uid, self.env.uid, SQL(
+                "sale.date_order >= %s AND sale.date_order < %s + 1 AND (comm.vendor_id, sale.date_order::date) IN (%s)",
+                min(days), max(days), pairs,
+            ),
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild_range(self, date_from, date_to):
+        """ Recompute every shop's rows between two days (included) """
+        self._flush_sources()
+        self.env.cr.execute(SQL(
+            "DELETE FROM marketplace_vendor_sales_daily WHERE date >= %s AND date <= %s", date_from, date_to
+        ))
+        self.env.cr.execute(SQL(
+            self._ROLLUP_QUERY, self.env.uid, self.env.uid, SQL(
+                "sale.date_order >= %s AND sale.date_order < %s + 1", date_from, date_to,
+            ),
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild_all(self):
+        """ Backfill: rebuild the whole history, one window of days per transaction """
+        self._flush_sources()
+        self.env.cr.execute("""
+            SELECT MIN(sale.date_order)::date, MAX(sale.date_order)::date
+              FROM marketplace_commission comm
+              JOIN sale_order_line line ON line.id = comm.order_line_id
+              JOIN sale_order sale ON sale.id = line.order_id
+        """)
+        first_day, last_day = self.env.cr.fetchone()
+        if not first_day:
+            self.env.cr.execute("DELETE FROM marketplace_vendor_sales_daily")
+            return 0
+
+        # Rows outside the history (orders deleted since) go as well
+        self.env.cr.execute(SQL(
+            "DELETE FROM marketplace_vendor_sales_daily WHERE date < %s OR date > %s", first_day, last_day
+        ))
+        windows = 0
+        start = first_day
+        while start <= last_day:
+            end = min(fields.Date.add(start, days=self._REBUILD_DAYS - 1), last_day)
+            self._rebuild_range(start, end)
+            self.env.cr.commit()
+            windows += 1
+            start = fields.Date.add(end, days=1)
+        _logger.info("Rebuilt vendor daily sales from %s to %s", first_day, last_day)
+        return windows
+
+    @api.model
+    def _schedule_refresh(self, keys):
+        """ Refresh the ``(vendor_id, date)`` rows once, just before the transaction commits,
+        so confirming an order with many lines recomputes each day a single time.
+        """
+        cr = self.env.cr
+        pending = cr.precommit.data.get('marketplace_sales_daily_keys')
+        if pending is None:
+            pending = cr.precommit.data['marketplace_sales_daily_keys'] = set()
+            env = self.env
+
+            @cr.precommit.add
+            def refresh_days():
+                keys = cr.precommit.data.pop('marketplace_sales_daily_keys', set())
+                env['marketplace.vendor.sales.daily'].sudo()._refresh_days(keys)
+
+        pending.update(keys)
+
+    @api.model
+    def _get_series(self, vendor, date_from, date_to, granularity='day'):
+        """ Sales of ``vendor`` between two days (included), read from the rollup only.
+
+        Returns ``{'series': [{'period', 'gross', 'commission', 'net', 'orders', 'units'}], 'totals'}``
+        with one entry per day, week or month that has sales.
+        """
+        aggregates = ['gross:sum', 'commission:sum', 'net:sum', 'order_count:sum', 'unit_count:sum']
+        domain = [('vendor_id', '=', vendor.id), ('date', '>=', date_from), ('date', '<=', date_to)]
+        keys = ('gross', 'commission', 'net', 'orders', 'units')
+
+        series = []
+        totals = dict.fromkeys(keys, 0.0)
+        for period, *values in self._read_group(domain, ['date:%s' % granularity], aggregates):
+            entry = dict(zip(keys, (value or 0.0 for value in values)))
+            for key in keys:
+                totals[key] += entry[key]
+            entry['period'] = fields.Date.to_string(period)
+            series.append(entry)
+        return {'series': series, 'totals': totals}
+
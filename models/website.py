@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+
+from odoo import models, api, tools
+from odoo.http import request
+from odoo.tools.misc import file_path
+
+_logger = logging.getLogger(__name__)
+
+
+class Website(models.Model):
+    _inherit = 'website'
+
+    # Written by scripts/build_image_assets.py
+    _IMAGE_MANIFEST = 'marketplace_platform/static/src/img/dist/manifest.json'
+
+    @tools.ormcache()
+    def _get_marketplace_image_manifest(self):
+        """ Static image derivatives built at deploy time (empty when not built) """
+        try:
+            with open(file_path(self._IMAGE_MANIFEST)) as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            _logger.info("No built image manifest, static images are served as-is")
+        except ValueError:
+            _logger.warning("Invalid image manifest %s, static images are served as-is", self._IMAGE_MANIFEST)
+        return {}
+
+    def _get_marketplace_image_sources(self, src):
+        """ <picture> data of the static image ``src`` for marketplace_platform.responsive_image.
+
+        Returns ``{'src', 'width', 'height', 'sources': [{'type', 'srcset'}]}``,
+        with no sources (plain <img>) when the image was not built.
+        """
+        entry = self._get_marketplace_image_manifest().get(src)
+        if not entry:
+            return {'src': src, 'width': None, 'height': None, 'sources': []}
+        return {
+            'src': src,
+            'width': entry['width'],
+            'height': entry['height'],
+            'sources': [{
+                'type': source['type'],
+                'srcset': ', '.join('%s %sw' % (url, width) for url, width in source['srcset']),
+            } for source in entry['sources']],
+        }
+
+    @tools.ormcache('self.id', 'self.company_id.id')
+    def _get_marketplace_stock_location_id(self):
+        """ Stock location of the vendor portal's quantities (False if none): the
+        website's warehouse, else the first warehouse of its company.
+        Cached per (website, company), cleared when a warehouse changes.
+        """
+        warehouse = self.sudo().warehouse_id
+        if not warehouse:
+            warehouse = self.env['stock.warehouse'].sudo().search([('company_id', '=', self.company_id.id)], limit=1)
+        return warehouse.lot_stock_id.id or False
+
+    def write(self, vals):
+        res = super(Website, self).write(vals)
+        if 'warehouse_id' in vals or 'company_id' in vals:
+            self.env.registry.clear_cache()
+        return res
+
+    def _get_marketplace_cart_summary(self):
+        """ Cart badge data ``{'order_id', 'quantity', 'total', 'currency_id'}`` or None.
+
+        Read from the session, so the navbar does not load the sale order on
+        every page. It is rebuilt when the session's cart changed under it.
+        """
+        order_id = request.session.get('sale_order_id')
+        if not order_id:
+            return None
+        summary = request.session.get('marketplace_cart_summary')
+        if summary and summary['order_id'] == order_id:
+            return summary
+        return self._update_marketplace_cart_summary()
+
+    def _update_marketplace_cart_summary(self, order=None):
+        """ Store the summary of ``order`` (default: the current cart) in the session.
+        To call after every change of the cart lines or of the cart itself.
+        """
+        if order is None:
+            order = self.sale_get_order()
+        if not order or order.state != 'draft':
+            request.session.pop('marketplace_cart_summary', None)
+            return None
+        summary = {
+            'order_id': order.id,
+            'quantity': order.cart_quantity,
+            'total': order.amount_total,
+            'currency_id': order.currency_id.id,
+        }
+        request.session['marketplace_cart_summary'] = summary
+        return summary
+
+
+class StockWarehouse(models.Model):
+    _inherit = 'stock.warehouse'
+
+    # Fields deciding Website._get_marketplace_stock_location_id
+    _MARKETPLACE_LOCATION_FIELDS = {'lot_stock_id', 'company_id', 'active', 'sequence'}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        warehouses = super(StockWarehouse, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return warehouses
+
+    def write(self, vals):
+        res = super(StockWarehouse, self).write(vals)
+        if self._MARKETPLACE_LOCATION_FIELDS.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super(StockWarehouse, self).unlink()
+        self.env.registry.clear_cache()
+        return res
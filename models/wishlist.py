@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api
+from odoo.http import request
+from odoo.tools.sql import SQL
 
 
 class ProductWishlist(models.Model):
@@ -44,3 +46,28 @@ class ProductWishlist(models.Model):
             return existing
         
         return self.create(vals)
+
+    @api.model
+    def _get_wishlist_product_tmpl_ids(self):
+        """Product template ids in the current user's wishlist.
+
+        Loaded with one query and kept on the request, so a product grid checks
+        membership in memory instead of one search_count per card.
+        """
+        if self.env.user._is_public():
+            return frozenset()
+        partner_id = self.env.user.partner_id.id
+        cached = getattr(request, '_marketplace_wishlist_tmpl_ids', None) if request else None
+        if cached is not None and cached[0] == partner_id:
+            return cached[1]
+
+        self.env.cr.execute(SQL("""
+            SELECT DISTINCT product.product_tmpl_id
+              FROM product_wishlist wish
+              JOIN product_product product ON product.id = wish.product_id
+             WHERE wish.partner_id = %s
+        """, partner_id))
+        tmpl_ids = frozenset(row[0] for row in self.env.cr.fetchall())
+        if request:
+            request._marketplace_wishlist_tmpl_ids = (partner_id, tmpl_ids)
+        return tmpl_ids
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Script to build the optimized variants of the static images (static/src/img)
+Run it before deploying: python3 scripts/build_image_assets.py
+
+For every PNG/JPEG it writes downscaled WebP (and AVIF when Pillow supports it)
+copies to static/src/img/dist/ and a manifest.json listing them. The
+marketplace_platform.responsive_image template reads the manifest to build
+<picture> srcsets, and falls back to the original file when nothing was built.
+"""
+import json
+import os
+import sys
+
+from PIL import Image, features
+
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMG_DIR = os.path.join(MODULE_DIR, 'static', 'src', 'img')
+DIST_DIR = os.path.join(IMG_DIR, 'dist')
+URL_PREFIX = '/marketplace_platform/static/src/img/'
+
+# Target widths (px) of the derivatives, never upscaled
+WIDTHS = [480, 960, 1600]
+
+# Output formats, best first: the browser takes the first <source> it supports
+FORMATS = [
+    ('avif', 'image/avif', {'quality': 50}),
+    ('webp', 'image/webp', {'quality': 80, 'method': 6}),
+]
+
+
+def get_formats():
+    """Formats this Pillow build can encode"""
+    formats = []
+    for ext, mimetype, options in FORMATS:
+        if ext == 'avif' and not features.check('avif'):
+            print("AVIF encoder not available in this Pillow build, skipping AVIF")
+            continue
+        formats.append((ext, mimetype, options))
+    return formats
+
+
+def build_image(rel_path, formats):
+    """Write the derivatives of one image and return its manifest entry"""
+    source_path = os.path.join(IMG_DIR, rel_path)
+    base_name = os.path.splitext(rel_path)[0]
+
+    with Image.open(source_path) as image:
+        image.load()
+        width, height = image.size
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        widths = [w for w in WIDTHS if w < width] + [width]
+        entry = {'width': width, 'height': height, 'sources': []}
+
+        for ext, mimetype, options in formats:
+            srcset = []
+            for target_width in widths:
+                target_height = round(height * target_width / width)
+                resized = image if target_width == width else image.resize((target_width, target_height), Image.LANCZOS)
+
+                out_rel = '%s-%s.%s' % (base_name, target_width, ext)
+                out_path = os.path.join(DIST_DIR, out_rel)
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                resized.save(out_path, ext.upper(), **options)
+                srcset.append([URL_PREFIX + 'dist/' + out_rel.replace(os.sep, '/'), target_width])
+
+            entry['sources'].append({'type': mimetype, 'srcset': srcset})
+
+    return entry
+
+
+def build_image_assets():
+    """Build every static image and write dist/manifest.json"""
+    formats = get_formats()
+    manifest = {}
+
+    for root, dirs, files in os.walk(IMG_DIR):
+        # Never re-process our own output
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != DIST_DIR]
+        for file_name in sorted(files):
+            if not file_name.lower().endswith(('.png', '.jpg', '.jpeg')):
+                continue
+            rel_path = os.path.relpath(os.path.join(root, file_name), IMG_DIR)
+            source_size = os.path.getsize(os.path.join(IMG_DIR, rel_path))
+
+            entry = build_image(rel_path, formats)
+            manifest[URL_PREFIX + rel_path.replace(os.sep, '/')] = entry
+
+            smallest = entry['sources'][0]['srcset'][0][0] if entry['sources'] else None
+            print(f"  - {rel_path}: {source_size // 1024} KB, {entry['width']}x{entry['height']}"
+                  f" -> {len(entry['sources'])} format(s), smallest {smallest}")
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+
+    print(f"\nBuilt {len(manifest)} images into {DIST_DIR}")
+    return len(manifest)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if build_image_assets() else 1)
+
+
+# To run this script:
+# 1. From the module directory (needs Pillow, already an Odoo dependency):
+#    python3 scripts/build_image_assets.py
+#
+# 2. Restart Odoo (or update the module) so the new manifest is read
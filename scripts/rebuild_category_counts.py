@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the stored published product count of every website category
+Run this script from Odoo shell after importing products directly in SQL
+"""
+
+def rebuild_category_counts(env):
+    """Recount published products (sub-categories included) for all categories"""
+
+    Category = env['product.public.category'].sudo()
+    Category._rebuild_published_product_count()
+    env.cr.commit()
+
+    categories = Category.search([], order='published_product_count desc')
+    print(f"Rebuilt product counts for {len(categories)} categories")
+    for category in categories[:10]:
+        print(f"  - {category.display_name}: {category.published_product_count} products")
+
+    return len(categories)
+
+
+# To run this script:
+# 1. From Odoo shell:
+#    python odoo-bin shell -c odoo.conf -d your_database_name
+#    Then run: exec(open('/path/to/this/script.py').read())
+#    Then run: rebuild_category_counts(env)
+#
+# 2. Or use the "Rebuild Product Counts" action on the website categories list
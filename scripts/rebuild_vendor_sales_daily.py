@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Script to backfill the daily vendor sales rollup (marketplace.vendor.sales.daily)
+Run this script from Odoo shell after installing the module, or after importing
+orders / commissions directly in SQL
+"""
+
+def rebuild_vendor_sales_daily(env):
+    """Rebuild the rollup of every vendor from the confirmed and paid commissions"""
+
+    Daily = env['marketplace.vendor.sales.daily'].sudo()
+    # Commits after each window of days
+    windows = Daily._rebuild_all()
+    env.cr.commit()
+
+    print(f"Rebuilt {windows} windows of {Daily._REBUILD_DAYS} days")
+    print(f"Total rows: {Daily.search_count([])}")
+
+    return windows
+
+
+# To run this script:
+# 1. From Odoo shell:
+#    python odoo-bin shell -c odoo.conf -d your_database_name
+#    Then run: exec(open('/path/to/this/script.py').read())
+#    Then run: rebuild_vendor_sales_daily(env)
+#
+# 2. Or add as a server action in Odoo UI
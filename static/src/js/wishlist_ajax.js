@@ -1,46 +1,62 @@
 /** @odoo-module **/
 
 document.addEventListener('DOMContentLoaded', function() {
-    // Handle wishlist heart clicks
+    // Handle wishlist heart clicks (product cards and product page carry data-product-id)
     document.addEventListener('click', function(e) {
-        const heartLink = e.target.closest('a[href*="/wishlist/add/"], a[href*="/wishlist/remove/"]');
+        const heartLink = e.target.closest('a[data-product-id][href*="/wishlist/add/"], a[data-product-id][href*="/wishlist/remove/"]');
         if (!heartLink) return;
-        
+
         e.preventDefault();
         e.stopPropagation();
-        
+
         const href = heartLink.getAttribute('href');
         const icon = heartLink.querySelector('i');
-        
+
         // Show loading
         const originalClass = icon.className;
         const originalColor = icon.style.color;
         icon.className = 'fa fa-spinner fa-spin';
-        
-        // Make request
-        fetch(href, {
-            method: 'GET',
+
+        // Toggle through the JSON route: no page is rendered server side
+        fetch('/wishlist/toggle', {
+            method: 'POST',
             headers: {
-                'X-Requested-With': 'XMLHttpRequest'
-            }
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                jsonrpc: '2.0',
+                method: 'call',
+                params: { product_tmpl_id: parseInt(heartLink.dataset.productId) }
+            })
         })
-        .then(response => {
-            if (response.redirected || response.ok) {
-                // Toggle heart icon
-                if (href.includes('/wishlist/add/')) {
-                    icon.className = 'fa fa-heart';
-                    icon.style.color = '#dc3545';
-                    heartLink.href = href.replace('/wishlist/add/', '/wishlist/remove/');
-                } else {
-                    icon.className = 'fa fa-heart-o';
-                    icon.style.color = '';
-                    heartLink.href = href.replace('/wishlist/remove/', '/wishlist/add/');
-                }
-            } else {
-                // Restore original if error
+        .then(response => response.json())
+        .then(data => {
+            if (data.error || !data.result || data.result.error) {
+                // Session expired or guest: follow the link (login redirect)
                 icon.className = originalClass;
                 icon.style.color = originalColor;
+                if (data.error) {
+                    window.location.href = href;
+                }
+                return;
             }
+
+            const productId = heartLink.dataset.productId;
+            const inWishlist = data.result.in_wishlist;
+
+            // Update every heart of this product on the page
+            icon.className = originalClass;
+            document.querySelectorAll(`a[data-product-id="${productId}"]`).forEach(link => {
+                const linkIcon = link.querySelector('i');
+                linkIcon.className = linkIcon.className.replace(/\bfa-heart(-o)?\b/, inWishlist ? 'fa-heart' : 'fa-heart-o');
+                linkIcon.style.color = inWishlist ? '#dc3545' : '';
+                link.classList.toggle('in-wishlist', inWishlist);
+                link.href = (inWishlist ? '/wishlist/remove/' : '/wishlist/add/') + productId;
+            });
+
+            document.querySelectorAll('[data-wishlist-count]').forEach(counter => {
+                counter.textContent = data.result.wishlist_count;
+            });
         })
         .catch(error => {
             console.error('Wishlist error:', error);